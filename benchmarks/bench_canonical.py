@@ -0,0 +1,47 @@
+"""
+Canonical encoding + SHA256: json.dumps/encode/hash vs the streaming encoder.
+
+    uv run python -m benchmarks.bench_canonical
+"""
+
+import hashlib
+
+from digital_signature.core.canonical import canonical_hash
+from digital_signature.utils.helper import canonicalize_metadata, sha256_digest
+
+from .common import peak_memory, sample_metadata, summarize, time_samples
+
+SIZES = [10, 1_000, 20_000]
+
+
+def materialized(metadata) -> str:
+    return sha256_digest(canonicalize_metadata(metadata))
+
+
+def streamed(metadata) -> str:
+    return canonical_hash(metadata, hashlib.sha256()).hexdigest()
+
+
+def main() -> None:
+    print(
+        f"{'ingredients':>11} {'bytes':>10} {'variant':>12} "
+        f"{'MB/s':>9} {'p50 ms':>9} {'peak KiB':>9}"
+    )
+    for size in SIZES:
+        metadata = sample_metadata(ingredients=size)
+        encoded_size = len(canonicalize_metadata(metadata))
+        assert materialized(metadata) == streamed(metadata)
+
+        repeat = 200 if size < 1_000 else 20
+        for name, fn in (("materialized", materialized), ("streamed", streamed)):
+            stats = summarize(time_samples(lambda: fn(metadata), repeat=repeat))
+            peak = peak_memory(lambda: fn(metadata))
+            throughput = encoded_size / (stats["p50_ms"] / 1000) / 1e6
+            print(
+                f"{size:>11} {encoded_size:>10} {name:>12} "
+                f"{throughput:>9.1f} {stats['p50_ms']:>9.3f} {peak / 1024:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Sign, verify, keygen, canonicalization and QR rendering, RSA-3072 vs ECDSA P-256.
+
+    uv run python -m benchmarks.bench_crypto
+    uv run python -m benchmarks.bench_crypto --quick -o results.json
+
+Every case reports ops/s, p50/p99 latency and peak Python memory. Results are
+printed as a table and written as JSON (default `benchmarks/results/crypto.json`)
+along with the raw samples, which benchmarks/perf_gate.py compares.
+"""
+
+import argparse
+import datetime
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from qrcode.exceptions import DataOverflowError
+
+from digital_signature.utils.decrypt import verify_signed_product_payload
+from digital_signature.utils.digests import platform_key
+from digital_signature.utils.encrypt import sign_product
+from digital_signature.utils.helper import (
+    canonicalize_metadata,
+    generate_ecdsa_keypair,
+    generate_qr,
+    generate_rsa_keypair,
+)
+
+from .common import peak_memory, sample_metadata, summarize, time_samples
+
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "crypto.json")
+
+SIZES = [10, 100, 1_000, 10_000]
+QR_SIZES = [1, 3, 5]  # a QR code holds ~3 KB, pubkey & signature included
+KEYGEN = {"RSA": generate_rsa_keypair, "ECDSA": generate_ecdsa_keypair}
+
+
+def _repeat(size: int, quick: bool) -> int:
+    repeat = 200 if size <= 100 else 50 if size <= 1_000 else 10
+    return max(5, repeat // 10) if quick else repeat
+
+
+def measure(
+    name: str, fn: Callable[[], Any], repeat: int, **params: Any
+) -> Dict[str, Any]:
+    samples = time_samples(fn, repeat=repeat)
+    return {
+        "name": name,
+        **params,
+        **summarize(samples),
+        "peak_kib": peak_memory(fn) / 1024,
+        "samples_ms": [sample * 1000 for sample in samples],
+    }
+
+
+def bench(quick: bool = False) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    keys = {algorithm: keygen() for algorithm, keygen in KEYGEN.items()}
+
+    for algorithm, keygen in KEYGEN.items():
+        repeat = 3 if quick else (10 if algorithm == "RSA" else 100)
+        results.append(
+            measure("keygen", keygen, repeat, algorithm=algorithm, ingredients=None)
+        )
+
+    for size in SIZES:
+        metadata = sample_metadata(ingredients=size)
+        repeat = _repeat(size, quick)
+        results.append(
+            measure(
+                "canonicalize_metadata",
+                lambda: canonicalize_metadata(metadata),
+                repeat,
+                algorithm=None,
+                ingredients=size,
+                bytes=len(canonicalize_metadata(metadata)),
+            )
+        )
+        for algorithm, (private_pem, public_pem) in keys.items():
+
+            def sign() -> Dict:
+                return sign_product(metadata, private_pem, public_pem, algorithm)
+
+            payload = sign()
+            results.append(
+                measure(
+                    "sign_product", sign, repeat, algorithm=algorithm, ingredients=size
+                )
+            )
+            results.append(
+                measure(
+                    "verify_signed_product_payload",
+                    lambda: verify_signed_product_payload(payload),
+                    repeat,
+                    algorithm=algorithm,
+                    ingredients=size,
+                )
+            )
+
+    for size in QR_SIZES:
+        metadata = sample_metadata(ingredients=size)
+        for algorithm, (private_pem, public_pem) in keys.items():
+            payload = sign_product(metadata, private_pem, public_pem, algorithm)
+            params = dict(algorithm=algorithm, ingredients=size)
+            try:
+                generate_qr(payload)
+            except DataOverflowError:
+                results.append({"name": "generate_qr", **params, "skipped": "overflow"})
+                continue
+            results.append(
+                measure(
+                    "generate_qr",
+                    lambda: generate_qr(payload),
+                    5 if quick else 30,
+                    **params,
+                )
+            )
+    return results
+
+
+def write_results(results: List[Dict[str, Any]], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "platform": platform_key(),
+                "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "results": results,
+            },
+            file,
+            indent=4,
+        )
+
+
+def _cell(value: Optional[Any]) -> str:
+    return "-" if value is None else str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions")
+    args = parser.parse_args()
+
+    results = bench(quick=args.quick)
+    print(
+        f"{'case':>30} {'alg':>6} {'ingredients':>11} "
+        f"{'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>9}"
+    )
+    for row in results:
+        head = (
+            f"{row['name']:>30} {_cell(row['algorithm']):>6} "
+            f"{_cell(row['ingredients']):>11}"
+        )
+        if "skipped" in row:
+            print(f"{head} {'skipped: ' + row['skipped']:>40}")
+            continue
+        print(
+            f"{head} {row['ops_per_sec']:>10.1f} {row['p50_ms']:>9.3f} "
+            f"{row['p99_ms']:>9.3f} {row['peak_kib']:>9.1f}"
+        )
+
+    write_results(results, args.output)
+    print(f"written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Payload digest throughput per algorithm, and the per-platform default.
+
+    uv run python -m benchmarks.bench_digest           # print results
+    uv run python -m benchmarks.bench_digest --write   # store the defaults
+
+The fastest algorithm on large metadata (per signature algorithm, since RSA
+cannot sign BLAKE2 digests) is written to `db_settings.digest_defaults_storage`
+under this platform's key, where `default_digest_alg` picks it up.
+"""
+
+import argparse
+import json
+import os
+from typing import Dict
+
+from digital_signature.database.connection import db_settings
+from digital_signature.utils.digests import (
+    DIGEST_ALGORITHMS,
+    SIGNATURE_SUPPORT,
+    platform_key,
+)
+from digital_signature.utils.helper import canonicalize_metadata, metadata_digest
+
+from .common import sample_metadata, summarize, time_samples
+
+SIZES = [10, 1_000, 20_000]
+
+
+def bench() -> Dict[int, Dict[str, float]]:
+    """ingredients -> {digest_alg: MB/s}"""
+    results: Dict[int, Dict[str, float]] = {}
+    for size in SIZES:
+        metadata = sample_metadata(ingredients=size)
+        encoded_size = len(canonicalize_metadata(metadata))
+        repeat = 200 if size < 1_000 else 20
+        results[size] = {}
+        for digest_alg in DIGEST_ALGORITHMS:
+            stats = summarize(
+                time_samples(
+                    lambda: metadata_digest(metadata, digest_alg=digest_alg),
+                    repeat=repeat,
+                )
+            )
+            results[size][digest_alg] = encoded_size / (stats["p50_ms"] / 1000) / 1e6
+    return results
+
+
+def pick_defaults(results: Dict[int, Dict[str, float]]) -> Dict[str, str]:
+    largest = results[max(results)]
+    return {
+        algorithm: max(supported, key=lambda digest_alg: largest[digest_alg])
+        for algorithm, supported in SIGNATURE_SUPPORT.items()
+    }
+
+
+def write_defaults(defaults: Dict[str, str]) -> None:
+    path = db_settings.digest_defaults_storage
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    data[platform_key()] = defaults
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(data, file, indent=4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--write", action="store_true", help="store the defaults")
+    args = parser.parse_args()
+
+    results = bench()
+    print(f"{'ingredients':>11} " + " ".join(f"{a:>11}" for a in DIGEST_ALGORITHMS))
+    for size, row in results.items():
+        print(f"{size:>11} " + " ".join(f"{row[a]:>6.1f}MB/s" for a in row))
+
+    defaults = pick_defaults(results)
+    print(f"defaults for {platform_key()}: {defaults}")
+    if args.write:
+        write_defaults(defaults)
+        print(f"written to {db_settings.digest_defaults_storage}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Import-time budgets for the signing / verification core and the scanner verifier.
+
+    uv run python -m benchmarks.bench_imports
+    uv run python -m benchmarks.bench_imports --repeat 20 --scale 1.5
+
+Each repetition imports a profile's modules in a fresh interpreter and measures
+the time spent in the import statements. Exits 1 when a profile's median
+exceeds its budget, or when the import drags in modules the profile must not
+load (Reflex, QR or imaging libraries, the app's settings, ...).
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import List, NamedTuple, Tuple
+
+_APP_ONLY = ("reflex", "qrcode", "PIL", "pyzbar", "sqlalchemy", "starlette")
+
+
+class Profile(NamedTuple):
+    name: str
+    modules: Tuple[str, ...]
+    budget_ms: float
+    forbidden: Tuple[str, ...]  # module names or package prefixes
+
+
+PROFILES = (
+    Profile(
+        "core",
+        (
+            "digital_signature.utils.encrypt",
+            "digital_signature.utils.decrypt",
+            "digital_signature.utils.helper",
+        ),
+        250.0,
+        _APP_ONLY,
+    ),
+    Profile(
+        "scanner",
+        ("digital_signature.core",),
+        100.0,
+        _APP_ONLY + ("cryptography", "digital_signature.database"),
+    ),
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - started
+forbidden = {forbidden!r}
+loaded = sorted(
+    prefix for prefix in forbidden
+    if any(name == prefix or name.startswith(prefix + ".") for name in sys.modules)
+)
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def probe(profile: Profile) -> Tuple[float, List[str]]:
+    """(import seconds, forbidden modules loaded) in a fresh process"""
+    code = _PROBE.format(
+        imports="\n".join(f"import {module}" for module in profile.modules),
+        forbidden=profile.forbidden,
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply every budget (slow CI)"
+    )
+    parser.add_argument("--profiles", nargs="+", choices=[p.name for p in PROFILES])
+    args = parser.parse_args()
+
+    status = 0
+    for profile in PROFILES:
+        if args.profiles and profile.name not in args.profiles:
+            continue
+        budget_ms = profile.budget_ms * args.scale
+        samples: List[float] = []
+        loaded: List[str] = []
+        for _ in range(args.repeat):
+            seconds, loaded = probe(profile)
+            samples.append(seconds * 1000)
+
+        median = statistics.median(samples)
+        print(
+            f"{profile.name}: p50 {median:.1f} ms, max {max(samples):.1f} ms "
+            f"(budget {budget_ms:.0f} ms, {args.repeat} runs)"
+        )
+        if loaded:
+            print(f"{profile.name} pulls in {', '.join(loaded)}", file=sys.stderr)
+            status = 1
+        if median > budget_ms:
+            print(
+                f"{profile.name} over budget by {median - budget_ms:.1f} ms",
+                file=sys.stderr,
+            )
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
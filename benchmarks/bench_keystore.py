@@ -0,0 +1,109 @@
+"""
+Key load time, base64-PEM JSON shards vs binary DER containers.
+
+    uv run python -m benchmarks.bench_keystore
+    uv run python -m benchmarks.bench_keystore --authors 1000 --repeat 500
+
+Registers the same RSA-3072 and ECDSA P-256 key pairs for `--authors`
+manufacturers in a scratch key store per format, then times, per lookup:
+
+    public    load_public_keys (PEM + fingerprint, as put in payloads)
+    private   private key ready to sign: load_pem_private_key(load_private_key)
+              for JSON, load_signing_key (load_der_private_key) for DER
+
+"cold" drops the in-process key store cache before every lookup (file read
+and decode included); "warm" is the steady state of a long-running worker.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+from typing import Callable, Dict, List
+
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+from digital_signature.database import keystore
+from digital_signature.database.connection import db_settings
+from digital_signature.utils.helper import (
+    generate_ecdsa_keypair,
+    generate_rsa_keypair,
+    load_private_key,
+    load_public_keys,
+    load_signing_key,
+    register_key,
+)
+
+from .common import summarize, time_samples
+
+FORMATS = ("json", "der")
+
+
+def _private_loader(fmt: str) -> Callable[[str], object]:
+    if fmt == "der":
+        return load_signing_key
+    return lambda author: load_pem_private_key(load_private_key(author), None)
+
+
+def bench(authors: int, repeat: int) -> List[Dict[str, object]]:
+    keys = {"RSA": generate_rsa_keypair(), "ECDSA": generate_ecdsa_keypair()}
+    results: List[Dict[str, object]] = []
+    for fmt in FORMATS:
+        with tempfile.TemporaryDirectory() as scratch:
+            db_settings.key_storage = os.path.join(scratch, "keys")
+            db_settings.keystore_generation_storage = os.path.join(scratch, "gen")
+            db_settings.key_storage_format = fmt
+            keystore._cache.clear()
+
+            for algorithm, (private_pem, public_pem) in keys.items():
+                names = [f"{algorithm} maker {i}" for i in range(authors)]
+                for name in names:
+                    register_key(private_pem, public_pem, author=name)
+                shard = keystore._shard_paths(keystore.PRIVATE, names[0])[0]
+
+                loaders = {
+                    "public": load_public_keys,
+                    "private": _private_loader(fmt),
+                }
+                for case, load in loaders.items():
+                    for cache in ("cold", "warm"):
+
+                        def lookup() -> None:
+                            if cache == "cold":
+                                keystore._cache.clear()
+                            load(random.choice(names))
+
+                        results.append(
+                            {
+                                "format": fmt,
+                                "algorithm": algorithm,
+                                "case": f"{case} {cache}",
+                                "shard_bytes": os.path.getsize(shard),
+                                **summarize(time_samples(lookup, repeat=repeat)),
+                            }
+                        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = bench(args.authors, args.repeat)
+    print(
+        f"{'format':<6} {'alg':<6} {'case':<13} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'private shard':>14}"
+    )
+    for row in results:
+        print(
+            f"{row['format']:<6} {row['algorithm']:<6} {row['case']:<13} "
+            f"{row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['shard_bytes']:>12} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
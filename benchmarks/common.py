@@ -0,0 +1,134 @@
+import gc
+import hashlib
+import math
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence
+
+
+def sample_metadata(ingredients: int = 10) -> Dict[str, Any]:
+    """Product metadata with `ingredients` ingredient/certificate entries"""
+    return {
+        "product_id": "SKU-12345",
+        "batch": "BATCH-2025-09-30",
+        "manufacturer": "ACME FOOD JSC",
+        "origin": "Việt Nam",
+        "production_date": "2025-09-30",
+        "expiry_date": "2026-09-30",
+        "ingredients": [
+            {
+                "name": f"ingredient-{i}",
+                "supplier": f"Nhà cung cấp {i % 17}",
+                "percentage": round(100 / (i + 1), 4),
+                "allergens": ["gluten", "soy"] if i % 3 == 0 else [],
+            }
+            for i in range(ingredients)
+        ],
+        "certificates": [
+            {
+                "issuer": f"Cert Authority {i % 5}",
+                "number": f"CERT-{i:08d}",
+                "valid_until": "2027-12-31",
+            }
+            for i in range(max(1, ingredients // 4))
+        ],
+    }
+
+
+def time_samples(
+    fn: Callable[[], Any], repeat: int = 50, warmup: int = 3
+) -> List[float]:
+    """Wall-clock duration (seconds) of `repeat` calls of fn"""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    median = statistics.median(samples)
+    return {
+        "ops_per_sec": 1 / median if median else float("inf"),
+        "p50_ms": median * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+    }
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated by Python while running fn once"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def machine_fingerprint() -> str:
+    """Short id of the hardware & runtime, timings are only compared like for like"""
+    from cryptography.hazmat.backends.openssl.backend import backend
+
+    parts = [
+        platform.system(),
+        platform.machine(),
+        platform.processor(),
+        str(os.cpu_count()),
+        platform.python_implementation(),
+        platform.python_version(),
+        backend.openssl_version_text(),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def mann_whitney_greater(new: Sequence[float], old: Sequence[float]) -> float:
+    """
+    One-sided Mann-Whitney U test (normal approximation, tie corrected):
+    p-value for "samples in `new` tend to be larger than in `old`".
+    Rank based, so a few outliers (GC, scheduler) do not swing it.
+    """
+    n1, n2 = len(new), len(old)
+    if not n1 or not n2:
+        return 1.0
+    pooled = sorted([(value, 0) for value in new] + [(value, 1) for value in old])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)  # continuity correction
+    return 0.5 * math.erfc(z / math.sqrt(2))
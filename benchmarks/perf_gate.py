@@ -0,0 +1,164 @@
+"""
+Performance regression gate for the hot crypto paths.
+
+    uv run python -m benchmarks.perf_gate                  # run, compare, record
+    uv run python -m benchmarks.perf_gate --set-baseline   # accept this run
+    uv run python -m benchmarks.perf_gate --results benchmarks/results/crypto.json
+
+Runs benchmarks/bench_crypto.py (or loads a results file it wrote) and compares
+every hot-path case with the stored baseline of this machine. A case regresses
+when its median got more than --threshold slower *and* a one-sided
+Mann-Whitney U test on the raw samples says the slowdown is not noise
+(p < --alpha). Exits 1 on any regression.
+
+Baselines and a short run history live in
+`benchmarks/baselines/<fingerprint>.json`, one file per machine fingerprint
+(hardware, Python, OpenSSL), so numbers from different machines are never
+compared. The first run on a machine becomes its baseline.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from .common import machine_fingerprint, mann_whitney_greater
+
+BASELINE_DIR = os.path.join("benchmarks", "baselines")
+HOT_PATHS = ("sign_product", "verify_signed_product_payload", "generate_qr")
+HISTORY_LIMIT = 50
+
+CaseKey = Tuple[str, Optional[str], Optional[int]]
+
+
+def case_key(row: Dict[str, Any]) -> CaseKey:
+    return row["name"], row.get("algorithm"), row.get("ingredients")
+
+
+def _label(key: CaseKey) -> str:
+    name, algorithm, ingredients = key
+    size = "-" if ingredients is None else ingredients
+    return f"{name}[{algorithm or '-'}, {size}]"
+
+
+def load_store(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_store(path: str, store: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(store, file, indent=4)
+
+
+def compare(
+    baseline: List[Dict[str, Any]],
+    current: List[Dict[str, Any]],
+    cases: Tuple[str, ...],
+    threshold: float,
+    alpha: float,
+) -> List[Dict[str, Any]]:
+    """One verdict per hot-path case present in both runs"""
+    previous = {case_key(row): row for row in baseline if "samples_ms" in row}
+    verdicts: List[Dict[str, Any]] = []
+    for row in current:
+        key = case_key(row)
+        if row["name"] not in cases or "samples_ms" not in row or key not in previous:
+            continue
+        old = previous[key]
+        ratio = row["p50_ms"] / old["p50_ms"] if old["p50_ms"] else 1.0
+        p_value = mann_whitney_greater(row["samples_ms"], old["samples_ms"])
+        verdicts.append(
+            {
+                "case": _label(key),
+                "baseline_p50_ms": old["p50_ms"],
+                "p50_ms": row["p50_ms"],
+                "ratio": ratio,
+                "p_value": p_value,
+                "regressed": ratio > 1 + threshold and p_value < alpha,
+            }
+        )
+    return verdicts
+
+
+def _history_entry(results: List[Dict[str, Any]], created_at: str) -> Dict[str, Any]:
+    return {
+        "created_at": created_at,
+        "results": [
+            {key: value for key, value in row.items() if key != "samples_ms"}
+            for row in results
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--results", help="compare this bench_crypto results file")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions")
+    parser.add_argument("--set-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="allowed median slowdown"
+    )
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance")
+    parser.add_argument("--cases", nargs="+", default=list(HOT_PATHS))
+    parser.add_argument("--baseline-dir", default=BASELINE_DIR)
+    args = parser.parse_args()
+
+    created_at = datetime.datetime.now().isoformat(timespec="seconds")
+    if args.results:
+        with open(args.results, "r") as file:
+            data = json.load(file)
+        results, created_at = data["results"], data.get("created_at", created_at)
+    else:
+        from .bench_crypto import bench
+
+        results = bench(quick=args.quick)
+
+    fingerprint = machine_fingerprint()
+    path = os.path.join(args.baseline_dir, f"{fingerprint}.json")
+    store = load_store(path)
+    history = store.get("history", [])
+    history.append(_history_entry(results, created_at))
+    store["history"] = history[-HISTORY_LIMIT:]
+
+    status = 0
+    if args.set_baseline or "baseline" not in store:
+        store["baseline"] = {"created_at": created_at, "results": results}
+        print(f"baseline for {fingerprint} set ({path})")
+    else:
+        verdicts = compare(
+            store["baseline"]["results"],
+            results,
+            tuple(args.cases),
+            args.threshold,
+            args.alpha,
+        )
+        print(f"{'case':>50} {'base ms':>9} {'now ms':>9} {'ratio':>7} {'p':>8}")
+        for verdict in verdicts:
+            print(
+                f"{verdict['case']:>50} {verdict['baseline_p50_ms']:>9.3f} "
+                f"{verdict['p50_ms']:>9.3f} {verdict['ratio']:>7.2f} "
+                f"{verdict['p_value']:>8.4f}"
+                + ("  REGRESSED" if verdict["regressed"] else "")
+            )
+        regressions = [verdict for verdict in verdicts if verdict["regressed"]]
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {path}", file=sys.stderr)
+            status = 1
+        elif not verdicts:
+            print("no hot-path cases in common with the baseline", file=sys.stderr)
+
+    save_store(path, store)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Admin-only diagnostics routes, enabled by setting `db_settings.admin_token`
+and authenticated with `Authorization: Bearer <token>`.
+
+    POST /api/admin/profile?seconds=10   start sampling the backend (202)
+    GET  /api/admin/profile              status of the last run
+    GET  /api/admin/profile?download=1   collapsed stacks of the last run
+    GET  /api/admin/events               rolling latency per state handler / var
+"""
+
+import hmac
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+from ..database.connection import db_settings
+from ..utils.profiler import profiler
+from ..utils.slow_events import event_stats
+
+
+def _authorized(request: Request) -> bool:
+    token = db_settings.admin_token
+    supplied = request.headers.get("authorization", "").removeprefix("Bearer ")
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+async def profile_endpoint(request: Request) -> Response:
+    if not _authorized(request):
+        return JSONResponse({"error": "not found"}, status_code=404)
+
+    if request.method == "POST":
+        try:
+            seconds = float(request.query_params.get("seconds", "10"))
+            interval = float(request.query_params.get("interval", "0")) or None
+        except ValueError:
+            return JSONResponse({"error": "invalid seconds/interval"}, status_code=400)
+        # Sampling runs on its own daemon thread, the event loop is not blocked
+        if not profiler.start(seconds, interval):
+            return JSONResponse(
+                {"error": "a profile is already running", **profiler.last_run},
+                status_code=409,
+            )
+        return JSONResponse(profiler.last_run, status_code=202)
+
+    if request.query_params.get("download"):
+        if not profiler.last_run.get("done"):
+            return JSONResponse({"error": "no finished profile"}, status_code=404)
+        return FileResponse(profiler.last_run["path"], media_type="text/plain")
+    return JSONResponse({"running": profiler.running, **profiler.last_run})
+
+
+async def events_endpoint(request: Request) -> Response:
+    if not _authorized(request):
+        return JSONResponse({"error": "not found"}, status_code=404)
+    return JSONResponse(
+        {
+            "threshold_ms": db_settings.slow_event_threshold_ms,
+            "handlers": event_stats(),
+        }
+    )
+
+
+routes = [
+    Route("/api/admin/profile", profile_endpoint, methods=["GET", "POST"]),
+    Route("/api/admin/events", events_endpoint, methods=["GET"]),
+]
@@ -0,0 +1,98 @@
+"""
+Request body caps, enforced before the request reaches its handler.
+
+Reflex's `/_upload` endpoint parses the whole multipart body and copies every
+file into memory before the upload event handler runs, so the cap in
+utils/uploads.py cannot protect memory on its own. This ASGI middleware
+rejects a request with 413 as soon as its Content-Length, or the bytes
+received so far for chunked bodies, pass the limit of its path.
+"""
+
+from typing import Dict, Optional
+from reflex.constants import Endpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..database.connection import db_settings
+
+UPLOAD_PATH = str(Endpoint.UPLOAD)
+
+
+def _default_limits() -> Dict[str, int]:
+    return {UPLOAD_PATH: db_settings.upload_request_max_bytes}
+
+
+class BodySizeLimit:
+    """413 for request bodies over the limit of their path prefix"""
+
+    def __init__(self, app: ASGIApp, limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.limits = limits if limits is not None else _default_limits()
+
+    def _limit(self, path: str) -> Optional[int]:
+        for prefix, limit in self.limits.items():
+            if path == prefix or path.startswith(prefix + "/"):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self._limit(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", b"-1"))
+        except ValueError:
+            declared = -1
+        if declared > limit:
+            await _reject(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Looks like a client disconnect to the handler, which stops
+                    # reading; the 413 is sent below
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if exceeded and not started:
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or started:
+                raise
+        if exceeded and not started:
+            await _reject(send, limit)
+
+
+async def _reject(send: Send, limit: int) -> None:
+    body = f"request body larger than {limit} bytes".encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,21 @@
+"""
+GET /metrics: per-stage latency histograms & error counters in the Prometheus
+text exposition format, for this backend process.
+"""
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from ..database.connection import db_settings
+from ..utils.metrics import render_metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if not db_settings.metrics_enabled:
+        return PlainTextResponse("metrics are disabled\n", status_code=404)
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
+routes = [Route("/metrics", metrics_endpoint, methods=["GET"])]
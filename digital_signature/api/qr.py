@@ -0,0 +1,36 @@
+"""
+GET /qr/<key>.png: QR images registered through utils.qr_cache. Keys are
+content hashes, so responses are immutable: strong ETag, one-year caching and
+304 on a matching If-None-Match (for registered keys only).
+"""
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from ..utils.qr_cache import exists, get_png
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def qr_endpoint(request: Request) -> Response:
+    key = request.path_params["key"]
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    # "*" matches any current representation, so unknown keys still get a 404
+    if _etag_matches(request.headers.get("if-none-match", ""), etag) and exists(key):
+        return Response(status_code=304, headers=headers)
+
+    # Rendering a cold image is CPU bound, keep it off the event loop
+    png = await run_in_threadpool(get_png, key)
+    if png is None:
+        return PlainTextResponse("unknown QR code", status_code=404)
+    return Response(png, media_type="image/png", headers=headers)
+
+
+routes = [Route("/qr/{key}.png", qr_endpoint, methods=["GET"])]
@@ -0,0 +1,14 @@
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from .admin import routes as admin_routes
+from .limits import BodySizeLimit
+from .metrics import routes as metrics_routes
+from .qr import routes as qr_routes
+from .verify import routes as verify_routes
+
+# Mounted in front of the Reflex backend through `rx.App(api_transformer=...)`,
+# so the middleware also sees Reflex's own routes (uploads)
+api = Starlette(
+    routes=[*verify_routes, *metrics_routes, *admin_routes, *qr_routes],
+    middleware=[Middleware(BodySizeLimit)],
+)
@@ -0,0 +1,144 @@
+"""
+Stateless verification endpoint for handheld scanners.
+
+POST /api/verify accepts one payload, a JSON array of payloads, or NDJSON
+(`Content-Type: application/x-ndjson`, one payload per line) and streams one
+NDJSON verdict per payload back, in input order, as soon as it is ready.
+"""
+
+import asyncio
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from ..database.connection import db_settings
+from ..core.verifier import STAGE_STRUCTURE
+from ..utils.decrypt import verify_payload
+
+NDJSON = "application/x-ndjson"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=db_settings.verify_api_workers,
+            thread_name_prefix="verify-api",
+        )
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    """Node-wide cap on verifications in flight, shared by every client"""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(db_settings.verify_api_concurrency)
+    return _slots
+
+
+def _verify_one(item: Any) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        return {
+            "valid": False,
+            "failed_stage": STAGE_STRUCTURE,
+            "reason": "payload must be a JSON object",
+            "passed": [],
+        }
+    result = asdict(verify_payload(item))
+    result["passed"] = list(result["passed"])
+    return result
+
+
+def _line(index: int, result: Dict[str, Any]) -> bytes:
+    return (
+        json.dumps({"index": index, **result}, separators=(",", ":")) + "\n"
+    ).encode("utf-8")
+
+
+def _parse(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+async def _iter_list(items: list) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def _verify_stream(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    slots = _get_slots()
+    pending: Deque[Tuple[int, asyncio.Future]] = deque()
+    index = 0
+
+    async for item in items:
+        # Per-request window, so one large batch cannot take every slot
+        if len(pending) >= db_settings.verify_api_window:
+            head_index, head = pending.popleft()
+            yield _line(head_index, await head)
+
+        await slots.acquire()
+        future = loop.run_in_executor(_get_executor(), _verify_one, item)
+        future.add_done_callback(lambda _: slots.release())
+        pending.append((index, future))
+        index += 1
+
+        while pending and pending[0][1].done():
+            head_index, head = pending.popleft()
+            yield _line(head_index, head.result())
+
+    while pending:
+        head_index, head = pending.popleft()
+        yield _line(head_index, await head)
+
+
+async def verify_endpoint(request: Request) -> Response:
+    headers = {"Keep-Alive": f"timeout={db_settings.verify_api_keep_alive}"}
+
+    if request.headers.get("content-type", "").startswith(NDJSON):
+        # The body is read up front: StreamingResponse listens on `receive`
+        # for disconnects while streaming, so it cannot be consumed lazily
+        lines = [line for line in (await request.body()).splitlines() if line.strip()]
+        if len(lines) > db_settings.verify_api_max_batch:
+            return JSONResponse(
+                {"error": f"at most {db_settings.verify_api_max_batch} payloads"},
+                status_code=413,
+                headers=headers,
+            )
+        items = _iter_list([_parse(line) for line in lines])
+    else:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return JSONResponse(
+                {"error": "invalid JSON body"}, status_code=400, headers=headers
+            )
+        if isinstance(body, dict):
+            body = body.get("payloads", [body])
+        if not isinstance(body, list):
+            return JSONResponse(
+                {"error": "expected a payload or a list of payloads"},
+                status_code=400,
+                headers=headers,
+            )
+        if len(body) > db_settings.verify_api_max_batch:
+            return JSONResponse(
+                {"error": f"at most {db_settings.verify_api_max_batch} payloads"},
+                status_code=413,
+                headers=headers,
+            )
+        items = _iter_list(body)
+
+    return StreamingResponse(_verify_stream(items), media_type=NDJSON, headers=headers)
+
+
+routes = [Route("/api/verify", verify_endpoint, methods=["POST"])]
@@ -0,0 +1,36 @@
+"""
+Minimal verifier for embedded scanners: depends only on the standard library
+and `cryptography`, imports nothing from Reflex or the app's settings/storage,
+and has no module-level side effects.
+
+    from digital_signature.core import TrustStore, verify_json
+
+    trust = TrustStore("public_key.json")  # or TrustTable("trust.bin")
+    verdict = verify_json(qr_text, trust_store=trust)
+"""
+
+from .truststore import TrustStore
+from .trusttable import TrustTable, open_trust_store, write_trust_table
+from .verifier import (
+    STAGE_DIGEST,
+    STAGE_REGISTRY,
+    STAGE_SIGNATURE,
+    STAGE_STRUCTURE,
+    Verdict,
+    verify,
+    verify_json,
+)
+
+__all__ = [
+    "STAGE_DIGEST",
+    "STAGE_REGISTRY",
+    "STAGE_SIGNATURE",
+    "STAGE_STRUCTURE",
+    "TrustStore",
+    "TrustTable",
+    "Verdict",
+    "open_trust_store",
+    "verify",
+    "verify_json",
+    "write_trust_table",
+]
@@ -0,0 +1,47 @@
+"""
+Verify payloads from the command line, one JSON payload per file or per line
+of stdin:
+
+    python -m digital_signature.core payload.json --trust-store public_key.json
+    python -m digital_signature.core payload.json --trust-store trust.bin
+    zbarimg -q --raw label.png | python -m digital_signature.core -
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+
+from . import open_trust_store, verify_json
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m digital_signature.core",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("inputs", nargs="+", help="payload files, - for stdin lines")
+    parser.add_argument(
+        "--trust-store", help="key registry JSON or trust table (skipped if unset)"
+    )
+    parser.add_argument("--author", help="expected manufacturer")
+    args = parser.parse_args()
+
+    trust_store = open_trust_store(args.trust_store) if args.trust_store else None
+    all_valid = True
+    for source in args.inputs:
+        if source == "-":
+            texts = [line for line in sys.stdin if line.strip()]
+        else:
+            with open(source, "rb") as file:
+                texts = [file.read()]
+        for text in texts:
+            verdict = verify_json(text, trust_store=trust_store, author=args.author)
+            all_valid &= verdict.valid
+            print(json.dumps({"source": source, **asdict(verdict)}))
+    return 0 if all_valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Streaming form of `canonicalize_metadata`: sorted keys, no whitespace, UTF-8.
+The output is byte-for-byte identical to
+
+    json.dumps(metadata, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+but is produced in bounded chunks, so large metadata can be hashed without
+materializing the whole canonical string and its encoded copy.
+
+Objects are walked in Python while leaves and arrays (in slices of
+ARRAY_BATCH items) are handed to the C encoder, which keeps throughput close
+to json.dumps while memory stays bounded by the largest such slice.
+"""
+
+import json
+from typing import Any, Dict, Iterator, Protocol, Union
+
+CHUNK_SIZE = 64 * 1024  # characters buffered before a chunk is flushed
+ARRAY_BATCH = 64  # array items handed to the C encoder per call
+
+_encode = json.JSONEncoder(
+    separators=(",", ":"), sort_keys=True, ensure_ascii=False
+).encode
+
+
+class _Hasher(Protocol):
+    def update(self, data: bytes, /) -> None: ...
+
+
+class _Writer(Protocol):
+    def write(self, data: bytes, /) -> Any: ...
+
+
+def _iter_pieces(obj: Any) -> Iterator[str]:
+    if (
+        isinstance(obj, dict)
+        and obj
+        # json sorts non-string keys before stringifying them: let it handle those
+        and all(isinstance(key, str) for key in obj)
+    ):
+        separator = "{"
+        for key in sorted(obj):
+            yield separator + _encode(key) + ":"
+            yield from _iter_pieces(obj[key])
+            separator = ","
+        yield "}"
+    elif isinstance(obj, (list, tuple)) and len(obj) > ARRAY_BATCH:
+        # Encode the array in slices, dropping each slice's brackets
+        separator = "["
+        for start in range(0, len(obj), ARRAY_BATCH):
+            yield separator + _encode(obj[start : start + ARRAY_BATCH])[1:-1]
+            separator = ","
+        yield "]"
+    else:
+        yield _encode(obj)
+
+
+def iter_canonical_chunks(
+    metadata: Dict, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Yield the canonical encoding of `metadata` as UTF-8 chunks of roughly
+    `chunk_size` characters
+    """
+    pending = []
+    pending_size = 0
+    for piece in _iter_pieces(metadata):
+        pending.append(piece)
+        pending_size += len(piece)
+        if pending_size >= chunk_size:
+            yield "".join(pending).encode("utf-8")
+            pending = []
+            pending_size = 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def write_canonical(
+    metadata: Dict, sink: Union[_Hasher, _Writer], chunk_size: int = CHUNK_SIZE
+) -> int:
+    """
+    Stream the canonical encoding into a hashlib object (`update`) or a
+    writable buffer (`write`). Returns the number of bytes written.
+    """
+    emit = sink.update if hasattr(sink, "update") else sink.write
+    written = 0
+    for chunk in iter_canonical_chunks(metadata, chunk_size=chunk_size):
+        emit(chunk)
+        written += len(chunk)
+    return written
+
+
+def canonical_hash(metadata: Dict, hasher: _Hasher) -> _Hasher:
+    """Feed the canonical encoding of `metadata` into `hasher` and return it"""
+    write_canonical(metadata, hasher)
+    return hasher
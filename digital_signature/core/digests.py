@@ -0,0 +1,46 @@
+"""
+Digest algorithms usable for the payload `digest` field and the signature hash.
+Payloads without a `digest_alg` field were produced with SHA-256.
+
+`cryptography` is only imported when a signature hash is first requested.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, Tuple
+
+LEGACY_DIGEST_ALG = "sha256"
+
+# name -> (hashlib constructor, cryptography hash used for the signature, built
+# from the `cryptography.hazmat.primitives.hashes` module)
+DIGEST_ALGORITHMS: Dict[str, Tuple[Callable[[], Any], Callable[[Any], Any]]] = {
+    "sha256": (hashlib.sha256, lambda hashes: hashes.SHA256()),
+    "sha512_256": (
+        lambda: hashlib.new("sha512_256"),
+        lambda hashes: hashes.SHA512_256(),
+    ),
+    "sha3_256": (hashlib.sha3_256, lambda hashes: hashes.SHA3_256()),
+    "blake2b": (hashlib.blake2b, lambda hashes: hashes.BLAKE2b(64)),
+}
+
+# OpenSSL cannot produce RSA-PSS signatures over BLAKE2 digests
+SIGNATURE_SUPPORT: Dict[str, Tuple[str, ...]] = {
+    "RSA": ("sha256", "sha512_256", "sha3_256"),
+    "ECDSA": ("sha256", "sha512_256", "sha3_256", "blake2b"),
+}
+
+
+def new_hasher(digest_alg: str) -> Any:
+    try:
+        return DIGEST_ALGORITHMS[digest_alg][0]()
+    except KeyError:
+        raise ValueError(f"Unsupported digest algorithm: {digest_alg}")
+
+
+def signature_hash(digest_alg: str) -> Any:
+    """cryptography `HashAlgorithm` instance for `digest_alg`"""
+    from cryptography.hazmat.primitives import hashes
+
+    try:
+        return DIGEST_ALGORITHMS[digest_alg][1](hashes)
+    except KeyError:
+        raise ValueError(f"Unsupported digest algorithm: {digest_alg}")
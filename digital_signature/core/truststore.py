@@ -0,0 +1,75 @@
+"""
+File-based trust store: which public key fingerprints are registered for
+which manufacturer. Reads the same JSON layout as the key registry
+(`db_settings.public_key_storage`, or the sharded store merged with
+`python -m digital_signature.database.keystore export <file>`):
+
+    {"<manufacturer>": {"fingerprint": "<sha256 of the PEM>", ...}, ...}
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+
+class TrustStore:
+    """
+    Fingerprint -> manufacturers index, loaded lazily and reloaded when the
+    file changes on disk (checked at most every `recheck_seconds`).
+    """
+
+    __slots__ = ("path", "recheck_seconds", "_index", "_stamp", "_checked_at")
+
+    def __init__(self, path: Optional[str] = None, recheck_seconds: float = 5.0):
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self._index: Dict[str, FrozenSet[str]] = {}
+        self._stamp: Optional[tuple] = None
+        self._checked_at = float("-inf")
+
+    @classmethod
+    def from_mapping(cls, registry: Dict[str, Any]) -> "TrustStore":
+        """In-memory store from an already loaded registry"""
+        store = cls(path=None)
+        store._index = _build_index(registry)
+        return store
+
+    def _refresh(self) -> None:
+        if self.path is None:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.recheck_seconds:
+            return
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._index, self._stamp = {}, None
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                registry = json.load(file)
+        except json.JSONDecodeError:
+            registry = {}
+        self._index, self._stamp = _build_index(registry), stamp
+
+    def is_trusted(self, fingerprint: str, author: str) -> bool:
+        self._refresh()
+        return author.lower() in self._index.get(fingerprint, frozenset())
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._index)
+
+
+def _build_index(registry: Dict[str, Any]) -> Dict[str, FrozenSet[str]]:
+    index: Dict[str, set] = {}
+    for author, keys in registry.items():
+        fingerprint = keys.get("fingerprint") if isinstance(keys, dict) else None
+        if fingerprint:
+            index.setdefault(fingerprint, set()).add(author.lower())
+    return {fingerprint: frozenset(authors) for fingerprint, authors in index.items()}
@@ -0,0 +1,256 @@
+"""
+Memory-mapped trust table: the key registry as a sorted, fixed-width binary
+file, for scanners checking fingerprints against millions of keys offline.
+
+    header   magic b"DSTRUST\\0", version (u16), record count (u32),
+             author count (u32), authors offset (u64), keys offset (u64),
+             key store generation at export (u64, 0 when unknown)
+    records  fingerprint (32 bytes), author id (u32), key length (u32),
+             key offset (u64); sorted by fingerprint, then author id
+    authors  author count + 1 offsets (u64) into the lower-cased UTF-8 names
+    keys     DER public keys (SubjectPublicKeyInfo), one per fingerprint
+
+Opening the file maps it and reads the header only; `is_trusted` binary
+searches the records in place, so lookups are O(log n) whatever the size and
+nothing is parsed up front. Export one from the app's key store with
+
+    uv run python -m digital_signature.database.keystore export-table trust.bin
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple, Union
+
+from .truststore import TrustStore
+
+MAGIC = b"DSTRUST\0"
+VERSION = 2
+
+_HEADER = struct.Struct(">8sHxxIIQQQ")
+_RECORD = struct.Struct(">32sIIQ")
+_OFFSET = struct.Struct(">Q")
+_FINGERPRINT_SIZE = 32
+
+
+def write_trust_table(
+    entries: Iterable[Tuple[str, str, bytes]], path: str, generation: int = 0
+) -> int:
+    """
+    Write (author, fingerprint hex, public key DER) entries to `path`
+    (replaced atomically), returns the number of records. `generation` tags
+    the table with the key store generation it was exported from
+    """
+    author_ids: Dict[str, int] = {}
+    keys: Dict[bytes, bytes] = {}
+    pairs: Set[Tuple[bytes, int]] = set()
+    for author, fingerprint, der in entries:
+        author_id = author_ids.setdefault(author.lower(), len(author_ids))
+        digest = bytes.fromhex(fingerprint)
+        keys.setdefault(digest, der)
+        pairs.add((digest, author_id))
+
+    names = [name.encode("utf-8") for name in author_ids]
+    records_offset = _HEADER.size
+    authors_offset = records_offset + len(pairs) * _RECORD.size
+    keys_offset = (
+        authors_offset
+        + (len(names) + 1) * _OFFSET.size
+        + sum(len(name) for name in names)
+    )
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(pairs),
+                len(names),
+                authors_offset,
+                keys_offset,
+                generation,
+            )
+        )
+        key_offsets: Dict[bytes, int] = {}
+        position = keys_offset
+        for digest, der in keys.items():
+            key_offsets[digest] = position
+            position += len(der)
+        for digest, author_id in sorted(pairs):
+            der_offset = key_offsets[digest]
+            file.write(_RECORD.pack(digest, author_id, len(keys[digest]), der_offset))
+
+        position = 0
+        for name in names:
+            file.write(_OFFSET.pack(position))
+            position += len(name)
+        file.write(_OFFSET.pack(position))
+        file.write(b"".join(names))
+        file.write(b"".join(keys.values()))
+    os.replace(tmp_path, path)
+    return len(pairs)
+
+
+class _Mapping(NamedTuple):
+    """One mapped version of the file, never changed once published"""
+
+    map: mmap.mmap
+    count: int
+    authors_offset: int
+    names_offset: int
+    generation: int
+
+    def record(self, index: int) -> Tuple[bytes, int, int, int]:
+        return _RECORD.unpack_from(self.map, _HEADER.size + index * _RECORD.size)
+
+    def first(self, digest: bytes) -> int:
+        """Index of the first record whose fingerprint is >= digest"""
+        mapped, low, high = self.map, 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = _HEADER.size + middle * _RECORD.size
+            if mapped[start : start + _FINGERPRINT_SIZE] < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def author(self, author_id: int) -> str:
+        start = self.authors_offset + author_id * _OFFSET.size
+        (begin,) = _OFFSET.unpack_from(self.map, start)
+        (end,) = _OFFSET.unpack_from(self.map, start + _OFFSET.size)
+        names = self.names_offset
+        return self.map[names + begin : names + end].decode("utf-8")
+
+
+def _map_table(path: str) -> _Mapping:
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, version, count, author_count, authors_offset, _, generation = (
+            _HEADER.unpack_from(mapped, 0)
+        )
+    except struct.error:
+        magic, version = b"", 0
+    if magic != MAGIC or version != VERSION:
+        mapped.close()
+        raise ValueError(f"{path} is not a version {VERSION} trust table")
+    names_offset = authors_offset + (author_count + 1) * _OFFSET.size
+    return _Mapping(mapped, count, authors_offset, names_offset, generation)
+
+
+class TrustTable:
+    """
+    Same interface as TrustStore, backed by a mapped trust table; the file is
+    remapped when it is replaced on disk (checked at most every
+    `recheck_seconds`).
+
+    Every lookup works on the mapping current when it started: a remap
+    publishes a new `_Mapping` and drops the reference to the old one, which
+    is unmapped once the last reader is done with it, never closed under it
+    """
+
+    __slots__ = (
+        "path",
+        "recheck_seconds",
+        "_lock",
+        "_mapping",
+        "_stamp",
+        "_checked_at",
+    )
+
+    def __init__(self, path: str, recheck_seconds: float = 5.0):
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._mapping: Optional[_Mapping] = None
+        self._stamp: Optional[tuple] = None
+        self._checked_at = float("-inf")
+
+    def _current(self) -> Optional[_Mapping]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.recheck_seconds:
+            with self._lock:
+                # Another thread may have refreshed while this one waited
+                if now - self._checked_at >= self.recheck_seconds:
+                    self._checked_at = now
+                    self._refresh()
+        return self._mapping
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._mapping, self._stamp = None, None
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            self._mapping = _map_table(self.path)
+            self._stamp = stamp
+
+    def close(self) -> None:
+        """Drop the mapping; it is unmapped once no lookup uses it any more"""
+        with self._lock:
+            self._mapping, self._stamp = None, None
+            self._checked_at = float("-inf")
+
+    @property
+    def generation(self) -> Optional[int]:
+        """Key store generation the table was exported at, None without a file"""
+        mapping = self._current()
+        return mapping.generation if mapping is not None else None
+
+    @staticmethod
+    def _digest(fingerprint: str) -> Optional[bytes]:
+        try:
+            digest = bytes.fromhex(fingerprint)
+        except (TypeError, ValueError):
+            return None
+        return digest if len(digest) == _FINGERPRINT_SIZE else None
+
+    def is_trusted(self, fingerprint: str, author: str) -> bool:
+        mapping = self._current()
+        digest = self._digest(fingerprint)
+        if mapping is None or digest is None:
+            return False
+        wanted = author.lower()
+        index = mapping.first(digest)
+        while index < mapping.count:
+            record_digest, author_id, _, _ = mapping.record(index)
+            if record_digest != digest:
+                break
+            if mapping.author(author_id) == wanted:
+                return True
+            index += 1
+        return False
+
+    def public_key(self, fingerprint: str) -> Optional[bytes]:
+        """DER public key registered under `fingerprint`, None if unknown"""
+        mapping = self._current()
+        digest = self._digest(fingerprint)
+        if mapping is None or digest is None:
+            return None
+        index = mapping.first(digest)
+        if index == mapping.count:
+            return None
+        record_digest, _, length, offset = mapping.record(index)
+        if record_digest != digest:
+            return None
+        return bytes(mapping.map[offset : offset + length])
+
+    def __len__(self) -> int:
+        mapping = self._current()
+        return mapping.count if mapping is not None else 0
+
+
+def open_trust_store(path: str) -> Union[TrustStore, TrustTable]:
+    """TrustTable for trust table files, TrustStore for JSON registries"""
+    try:
+        with open(path, "rb") as file:
+            is_table = file.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        is_table = False
+    return TrustTable(path) if is_table else TrustStore(path)
@@ -0,0 +1,168 @@
+"""
+Standalone payload verification: structure -> digest -> trust store ->
+signature, cheapest first, with the canonical metadata hashed once.
+
+The app's `utils.decrypt.verify_payload` runs the same pipeline with its key
+registry, metrics and signature cache plugged in through `trust_store`,
+`digest` and `check_signature`; by default nothing depends on the app's
+settings and `cryptography` is imported on the first signature check.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple, Union
+from .canonical import canonical_hash
+from .digests import LEGACY_DIGEST_ALG, SIGNATURE_SUPPORT, new_hasher, signature_hash
+
+
+class TrustSource(Protocol):
+    """TrustStore, TrustTable or any registry answering is_trusted()"""
+
+    def is_trusted(self, fingerprint: str, author: str) -> bool: ...
+
+
+# (metadata, digest_alg) -> digest of the canonical metadata
+DigestFunction = Callable[[Dict[str, Any], str], bytes]
+# (algorithm, public PEM, message digest, signature, digest_alg) -> valid
+SignatureCheck = Callable[[str, bytes, bytes, bytes, str], bool]
+
+STAGE_STRUCTURE = "structure"
+STAGE_DIGEST = "digest"
+STAGE_REGISTRY = "registry"
+STAGE_SIGNATURE = "signature"
+
+SIGNATURE_ALGORITHMS = tuple(SIGNATURE_SUPPORT)
+
+
+@dataclass(frozen=True)
+class Verdict:
+    valid: bool
+    failed_stage: Optional[str] = None  # None when every stage passed
+    reason: str = ""
+    passed: Tuple[str, ...] = ()
+
+
+def _metadata_digest(metadata: Dict[str, Any], digest_alg: str) -> bytes:
+    return canonical_hash(metadata, new_hasher(digest_alg)).digest()
+
+
+def _check_signature(
+    algorithm: str,
+    public_pem: bytes,
+    message_digest: bytes,
+    signature: bytes,
+    digest_alg: str,
+) -> bool:
+    from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.padding import MGF1, PSS
+    from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
+
+    hash_algorithm = signature_hash(digest_alg)
+    try:
+        public_key = load_pem_public_key(public_pem)
+        if algorithm == "RSA":
+            public_key.verify(
+                signature,
+                message_digest,
+                PSS(mgf=MGF1(hash_algorithm), salt_length=hash_algorithm.digest_size),
+                Prehashed(hash_algorithm),
+            )
+        else:
+            public_key.verify(
+                signature, message_digest, ec.ECDSA(Prehashed(hash_algorithm))
+            )
+        return True
+    except (
+        InvalidSignature,
+        UnsupportedAlgorithm,
+        ValueError,
+        TypeError,
+        AttributeError,
+    ):
+        # Bad signature, malformed key, key type not matching the algorithm or
+        # a hash the key type cannot sign with
+        return False
+
+
+def verify(
+    payload: Any,
+    trust_store: Optional[TrustSource] = None,
+    author: Optional[str] = None,
+    digest: DigestFunction = _metadata_digest,
+    check_signature: SignatureCheck = _check_signature,
+) -> Verdict:
+    """
+    Verify a signed payload (as produced by `sign_product`).
+    Without a trust store, the registry stage is skipped: the payload is then
+    only proven intact and signed by *some* key. `author` defaults to the
+    manufacturer named in the metadata. `check_signature` is only called
+    once the digest matched, so its verdict may be cached by digest.
+    """
+    passed: Tuple[str, ...] = ()
+
+    def failed(stage: str, reason: str) -> Verdict:
+        return Verdict(valid=False, failed_stage=stage, reason=reason, passed=passed)
+
+    # Structure
+    metadata = payload.get("metadata") if isinstance(payload, dict) else None
+    if not metadata or not isinstance(metadata, dict):
+        return failed(STAGE_STRUCTURE, "missing metadata")
+    for field in ("digest", "signature", "pubkey"):
+        if not isinstance(payload.get(field), str) or not payload[field]:
+            return failed(STAGE_STRUCTURE, f"missing {field}")
+    algorithm = payload.get("algorithm", "RSA")
+    if algorithm not in SIGNATURE_ALGORITHMS:
+        return failed(STAGE_STRUCTURE, f"unsupported algorithm {algorithm!r}")
+    digest_alg = payload.get("digest_alg", LEGACY_DIGEST_ALG)
+    if digest_alg not in SIGNATURE_SUPPORT[algorithm]:
+        return failed(
+            STAGE_STRUCTURE,
+            f"unsupported digest algorithm {digest_alg!r} for {algorithm}",
+        )
+    try:
+        signature = base64.b64decode(payload["signature"], validate=True)
+        public_pem = base64.b64decode(payload["pubkey"], validate=True)
+    except binascii.Error:
+        return failed(STAGE_STRUCTURE, "invalid base64 encoding")
+    passed += (STAGE_STRUCTURE,)
+
+    # Digest
+    message_digest = digest(metadata, digest_alg)
+    if message_digest.hex() != payload["digest"]:
+        return failed(STAGE_DIGEST, "digest does not match metadata")
+    passed += (STAGE_DIGEST,)
+
+    # Trust store
+    if trust_store is not None:
+        author = author or metadata.get("manufacturer", "")
+        fingerprint = hashlib.sha256(public_pem).hexdigest()
+        if not author or not trust_store.is_trusted(fingerprint, author):
+            return failed(STAGE_REGISTRY, "public key is not registered for author")
+        passed += (STAGE_REGISTRY,)
+
+    # Signature
+    if not check_signature(
+        algorithm, public_pem, message_digest, signature, digest_alg
+    ):
+        return failed(STAGE_SIGNATURE, "signature does not match")
+    passed += (STAGE_SIGNATURE,)
+
+    return Verdict(valid=True, passed=passed)
+
+
+def verify_json(
+    data: Union[str, bytes],
+    trust_store: Optional[TrustSource] = None,
+    author: Optional[str] = None,
+) -> Verdict:
+    """Verify a payload straight from its JSON text (e.g. a decoded QR code)"""
+    try:
+        payload = json.loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return Verdict(valid=False, failed_stage=STAGE_STRUCTURE, reason="invalid JSON")
+    return verify(payload, trust_store=trust_store, author=author)
@@ -2,7 +2,62 @@ class Settings:
     # local
     public_key_storage: str = r"data/public_key.json"
     private_key_storage: str = r"data/private_key.json"
+    key_storage: str = r"data/keys"  # sharded by manufacturer, see keystore.py
+    key_storage_format: str = "der"  # binary DER containers, or "json"
+    keystore_generation_storage: str = r"data/keystore.generation"
+    # exported trust table used instead of the key store while it is current
+    # ("" = off), see keystore.py
+    trust_table_storage: str = ""
     transaction_storage: str = r"data/transaction.json"
+    transaction_database_url: str = r"sqlite:///data/transactions.db"
+
+    # digests ("" = platform default from digest_defaults_storage, else sha256)
+    digest_algorithm: str = ""
+    digest_defaults_storage: str = r"data/digest_defaults.json"
+
+    # verification API
+    verify_api_workers: int = 8
+    verify_api_concurrency: int = 64  # verifications in flight across all clients
+    verify_api_window: int = 32  # verifications in flight per request
+    verify_api_max_batch: int = 10_000
+    verify_api_keep_alive: int = 75  # seconds, advertised to clients
+
+    # metrics (off: instrumented stages cost a single attribute lookup)
+    metrics_enabled: bool = True
+
+    # tracing (share of traces recorded, 0 = off)
+    trace_sample_rate: float = 0.01
+    trace_storage: str = r"data/traces.jsonl"
+
+    # admin (empty token = admin routes disabled)
+    admin_token: str = ""
+    profile_storage: str = r"data/profiles"
+    profile_max_seconds: float = 60
+    profile_interval: float = 0.01  # seconds between samples
+
+    # state handlers / computed vars slower than this are logged
+    slow_event_threshold_ms: float = 100
+    slow_event_window: int = 512  # runs kept per handler for the rolling stats
+    event_delta_stats: bool = False  # measure the state delta of every event
+
+    # QR images served from /qr/<key>.png
+    qr_cache_storage: str = r"data/qr_cache"
+    qr_cache_memory_items: int = 256
+
+    # QR image uploads (recipient page)
+    upload_max_bytes: int = 5 * 1024 * 1024
+    upload_chunk_bytes: int = 64 * 1024
+    upload_spool_bytes: int = 1024 * 1024  # larger uploads spill to a temp file
+    upload_request_max_bytes: int = 6 * 1024 * 1024  # whole multipart body
+
+    # threads for the blocking file / database calls of state handlers
+    storage_io_workers: int = 8
+
+    # ledger
+    ledger_storage: str = r"data/ledger"
+    ledger_segment_max_bytes: int = 4 * 1024 * 1024
+    ledger_block_records: int = 256  # records per gzip member in archived segments
+    ledger_cold_after_days: int = 1
 
 
 db_settings = Settings()
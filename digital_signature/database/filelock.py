@@ -0,0 +1,33 @@
+"""
+Advisory file locks shared by every process on the host (`fcntl.flock` on
+`<path>.lock`), for stores that are rewritten by read-modify-write.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+_process_lock = threading.RLock()
+
+
+@contextmanager
+def locked(path: str, exclusive: bool) -> Iterator[None]:
+    """Advisory lock on `<path>.lock`, shared by every process on the host"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fcntl is None:
+        with _process_lock:
+            yield
+        return
+    # flock is per open file, so threads of one process exclude each other too
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,93 @@
+"""
+Binary key container: raw DER keys behind a header index.
+
+    magic   b"DSKEYS" + version (u16)
+    count   u32
+    index   per key: author length (u16), author (UTF-8), encoding (u8),
+            fingerprint (32 bytes, zeros if none), offset (u32), length (u32)
+    blobs   the keys, back to back
+
+Public keys are SubjectPublicKeyInfo DER, private keys unencrypted PKCS#8 DER,
+i.e. the PEM the app signs with minus its base64 armor (`der_to_pem` rebuilds
+the exact bytes the fingerprint was computed on). Only the standard library is
+used here; parsing DER into key objects is left to `cryptography` callers.
+"""
+
+import base64
+import struct
+from typing import Any, Dict
+
+MAGIC = b"DSKEYS"
+VERSION = 1
+SUFFIX = ".bin"
+
+ENCODING_DER = 0
+
+PUBLIC_LABEL = "PUBLIC KEY"
+PRIVATE_LABEL = "PRIVATE KEY"
+
+_HEADER = struct.Struct(">6sHI")
+_ENTRY = struct.Struct(">B32sII")
+_AUTHOR_LENGTH = struct.Struct(">H")
+
+
+def der_to_pem(der: bytes, label: str) -> bytes:
+    """PEM armor as written by `cryptography` (64 character lines)"""
+    encoded = base64.b64encode(der).decode("ascii")
+    lines = [encoded[i : i + 64] for i in range(0, len(encoded), 64)]
+    body = "\n".join([f"-----BEGIN {label}-----", *lines, f"-----END {label}-----"])
+    return (body + "\n").encode("ascii")
+
+
+def pem_to_der(pem: bytes) -> bytes:
+    lines = pem.decode("ascii").strip().splitlines()
+    if len(lines) < 2 or not lines[0].startswith("-----BEGIN "):
+        raise ValueError("Not a PEM encoded key")
+    return base64.b64decode("".join(lines[1:-1]), validate=True)
+
+
+def pack(entries: Dict[str, Dict[str, Any]]) -> bytes:
+    """
+    Container for {author: {"der": bytes, "fingerprint": hex (optional)}};
+    other entry fields are not stored
+    """
+    encoded = [
+        (author.encode("utf-8"), entry["der"], entry.get("fingerprint"))
+        for author, entry in entries.items()
+    ]
+    offset = _HEADER.size + sum(
+        _AUTHOR_LENGTH.size + len(name) + _ENTRY.size for name, _, _ in encoded
+    )
+    index = bytearray(_HEADER.pack(MAGIC, VERSION, len(encoded)))
+    for name, der, fingerprint in encoded:
+        digest = bytes.fromhex(fingerprint) if fingerprint else bytes(32)
+        index += _AUTHOR_LENGTH.pack(len(name)) + name
+        index += _ENTRY.pack(ENCODING_DER, digest, offset, len(der))
+        offset += len(der)
+    return bytes(index) + b"".join(der for _, der, _ in encoded)
+
+
+def unpack(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """Inverse of `pack`, raises ValueError on a foreign or truncated file"""
+    try:
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a key container (or an unsupported version)")
+        entries: Dict[str, Dict[str, Any]] = {}
+        position = _HEADER.size
+        for _ in range(count):
+            (name_length,) = _AUTHOR_LENGTH.unpack_from(data, position)
+            position += _AUTHOR_LENGTH.size
+            author = data[position : position + name_length].decode("utf-8")
+            position += name_length
+            encoding, digest, offset, length = _ENTRY.unpack_from(data, position)
+            position += _ENTRY.size
+            if encoding != ENCODING_DER or offset + length > len(data):
+                raise ValueError(f"Corrupt key container entry for {author!r}")
+            entry: Dict[str, Any] = {"der": data[offset : offset + length]}
+            if any(digest):
+                entry["fingerprint"] = digest.hex()
+            entries[author] = entry
+    except struct.error as error:
+        raise ValueError("Truncated key container") from error
+    return entries
@@ -0,0 +1,384 @@
+"""
+Multi-process-safe key stores, sharded by manufacturer:
+
+    <key_storage>/index.jsonl               {"author": ..., "shard": ...} per line
+    <key_storage>/<shard>/public_key.bin    DER public keys + fingerprints
+    <key_storage>/<shard>/private_key.bin   DER private keys
+
+Shards are binary containers (database/keyfile.py), or base64-PEM JSON files
+(`public_key.json`, ...) when `db_settings.key_storage_format` is "json";
+readers fall back to the other format.
+
+The shard is derived from the lower-cased manufacturer name (as in the
+ledger), so a lookup opens that manufacturer's files only and registering a
+new one writes its shard and appends one index line. The single-file stores
+(`public_key_storage`, `private_key_storage`) are still read for authors
+without a shard; `migrate_legacy()` copies them over (the single-file stores
+are kept until deleted by hand), `convert_shards()` turns
+JSON shards into containers, and `export_public()` / `export_trust_table()`
+rebuild a single registry file / a memory-mapped trust table for scanners:
+
+    uv run python -m digital_signature.database.keystore migrate
+    uv run python -m digital_signature.database.keystore convert
+    uv run python -m digital_signature.database.keystore export trust_store.json
+    uv run python -m digital_signature.database.keystore export-table trust.bin
+
+Writers hold an exclusive `fcntl.flock` on `<store>.lock` (database/filelock.py)
+for the whole
+read-modify-write and replace the store by atomic rename, so concurrent
+registrations from several backend workers are serialized and readers never
+see a partial file. Every write then bumps the counter in
+`db_settings.keystore_generation_storage`.
+
+Each process keeps the parsed stores in memory, tagged with the generation
+file's stat (inode, mtime, size) at load time. A read only costs a `stat` of
+that file; the store is re-read (under a shared lock) once another process
+has bumped the generation. Stores edited by hand are picked up after
+the next registration, `bump_generation()` or a restart.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+from . import keyfile
+from ..core.trusttable import write_trust_table
+from .connection import db_settings
+from .filelock import locked
+from .ledger import shard_name
+
+_cache: Dict[str, Tuple[Optional[tuple], Dict[str, Any]]] = {}
+_generation: Tuple[Optional[tuple], int] = (None, 0)
+
+
+def _write_atomic(path: str, data: Any) -> None:
+    """JSON, or a binary key container for `keyfile.SUFFIX` paths"""
+    if path.endswith(keyfile.SUFFIX):
+        content = keyfile.pack(data)
+    else:
+        content = json.dumps(data, indent=4).encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "rb") as file:
+            content = file.read()
+        if path.endswith(keyfile.SUFFIX):
+            return keyfile.unpack(content)
+        data = json.loads(content)
+    except (FileNotFoundError, ValueError):  # JSONDecodeError is a ValueError
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def generation_stamp() -> Optional[tuple]:
+    """Changes whenever any process writes a key store, None before the first"""
+    try:
+        stat = os.stat(db_settings.keystore_generation_storage)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def current_generation() -> int:
+    """Counter written by `bump_generation()`, 0 before the first write"""
+    global _generation
+    stamp = generation_stamp()
+    if stamp is None:
+        return 0
+    if _generation[0] != stamp:
+        path = db_settings.keystore_generation_storage
+        with locked(path, exclusive=False):
+            try:
+                with open(path, "r", encoding="ascii") as file:
+                    generation = int(file.read().strip() or 0)
+            except (FileNotFoundError, ValueError):
+                generation = 0
+        _generation = (stamp, generation)
+    return _generation[1]
+
+
+def bump_generation() -> int:
+    """Tell every process to drop its cached stores, returns the new counter"""
+    path = db_settings.keystore_generation_storage
+    with locked(path, exclusive=True):
+        try:
+            with open(path, "r", encoding="ascii") as file:
+                generation = int(file.read().strip() or 0) + 1
+        except (FileNotFoundError, ValueError):
+            generation = 1
+        _write_atomic(path, generation)
+    return generation
+
+
+def read_store(path: str) -> Dict[str, Any]:
+    """
+    Parsed key store, served from memory until the generation changes.
+    The returned dict is shared: treat it as read-only
+    """
+    stamp = generation_stamp()
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with locked(path, exclusive=False):
+        data = _read(path)
+    _cache[path] = (stamp, data)
+    return data
+
+
+def update_store(path: str, author: str, keys: Dict[str, Any]) -> bool:
+    """Merge `keys` into the author's entry, True if the store was created"""
+    with locked(path, exclusive=True):
+        created = not os.path.exists(path)
+        data = _read(path)
+        data.setdefault(author, {}).update(keys)
+        _write_atomic(path, data)
+    bump_generation()
+    return created
+
+
+# Sharded layout
+
+PUBLIC = "public_key"
+PRIVATE = "private_key"
+INDEX_NAME = "index.jsonl"
+
+_LABELS = {PUBLIC: keyfile.PUBLIC_LABEL, PRIVATE: keyfile.PRIVATE_LABEL}
+
+
+def _legacy_path(kind: str) -> str:
+    if kind == PUBLIC:
+        return db_settings.public_key_storage
+    return db_settings.private_key_storage
+
+
+def _shard_paths(kind: str, author: str) -> Tuple[str, str]:
+    """(container, JSON) paths of the author's shard, preferred format first"""
+    base = os.path.join(db_settings.key_storage, shard_name(author), kind)
+    if db_settings.key_storage_format == "json":
+        return base + ".json", base + keyfile.SUFFIX
+    return base + keyfile.SUFFIX, base + ".json"
+
+
+def _index_path() -> str:
+    return os.path.join(db_settings.key_storage, INDEX_NAME)
+
+
+def shard_entries(kind: str, author: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Entries of every spelling of `author` (case-insensitive) from both files
+    of its shard (the preferred format wins for the same name), or from the
+    single-file store for authors registered before sharding
+    """
+    preferred, other = (read_store(path) for path in _shard_paths(kind, author))
+    if preferred and other:
+        return {**other, **preferred}
+    if preferred or other:
+        return preferred or other
+    wanted = author.lower()
+    return {
+        name: keys
+        for name, keys in read_store(_legacy_path(kind)).items()
+        if name.lower() == wanted
+    }
+
+
+def author_keys(kind: str, author: str) -> Optional[Dict[str, Any]]:
+    """The author's entry (exact name), None if not registered"""
+    return shard_entries(kind, author).get(author)
+
+
+def entry_der(kind: str, entry: Dict[str, Any]) -> bytes:
+    if "der" in entry:
+        return entry["der"]
+    return keyfile.pem_to_der(base64.b64decode(entry[kind]))
+
+
+def entry_pem(kind: str, entry: Dict[str, Any]) -> bytes:
+    if "der" in entry:
+        return keyfile.der_to_pem(entry["der"], _LABELS[kind])
+    return base64.b64decode(entry[kind])
+
+
+def _entry(kind: str, pem: bytes, container: bool) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {}
+    if container:
+        entry["der"] = keyfile.pem_to_der(pem)
+        if keyfile.der_to_pem(entry["der"], _LABELS[kind]) != pem:
+            raise ValueError("Key PEM is not in canonical form, store it as JSON")
+    else:
+        entry[kind] = base64.b64encode(pem).decode("ascii")
+    if kind == PUBLIC:
+        entry["fingerprint"] = hashlib.sha256(pem).hexdigest()
+    return entry
+
+
+def _discard(path: str, author: str) -> None:
+    if not os.path.exists(path):
+        return
+    with locked(path, exclusive=True):
+        data = _read(path)
+        if data.pop(author, None) is None:
+            return
+        if data:
+            _write_atomic(path, data)
+        else:
+            os.remove(path)
+    bump_generation()
+
+
+def register(kind: str, author: str, pem: bytes) -> None:
+    """
+    Add / replace the author's key, touching only its shard. Keys whose PEM
+    would not round-trip through DER (e.g. traditional OpenSSL RSA keys) go
+    to the JSON file of the shard even when containers are preferred
+    """
+    path, other_path = _shard_paths(kind, author)
+    new_shard = not (os.path.exists(path) or os.path.exists(other_path))
+    try:
+        entry = _entry(kind, pem, path.endswith(keyfile.SUFFIX))
+    except ValueError:
+        path, other_path = other_path, path
+        entry = _entry(kind, pem, False)
+    update_store(path, author, entry)
+    # Drop the entry this replaces from the shard's other file
+    _discard(other_path, author)
+    if new_shard and kind == PUBLIC:
+        line = json.dumps({"author": author, "shard": shard_name(author)})
+        with locked(_index_path(), exclusive=True):
+            with open(_index_path(), "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+
+def authors() -> Iterator[Tuple[str, str]]:
+    """(first registered spelling, shard) of every sharded manufacturer"""
+    try:
+        with open(_index_path(), "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    yield entry["author"], entry["shard"]
+    except FileNotFoundError:
+        return
+
+
+def migrate_legacy() -> int:
+    """
+    Copy the single-file stores into shards, returns the authors moved.
+    The single-file stores are left in place (their entries are only read for
+    authors without a shard); delete them once the migration is checked
+    """
+    moved = 0
+    for kind in (PUBLIC, PRIVATE):
+        for author, keys in _read(_legacy_path(kind)).items():
+            if not any(author in _read(path) for path in _shard_paths(kind, author)):
+                register(kind, author, entry_pem(kind, keys))
+                if kind == PUBLIC:
+                    moved += 1
+    return moved
+
+
+def convert_shards() -> int:
+    """
+    Rewrite JSON shards as key containers (skipping keys whose PEM would not
+    round-trip), returns the keys converted
+    """
+    converted = 0
+    for author, _ in authors():
+        for kind in (PUBLIC, PRIVATE):
+            base = os.path.join(db_settings.key_storage, shard_name(author), kind)
+            json_path, container_path = base + ".json", base + keyfile.SUFFIX
+            with (
+                locked(json_path, exclusive=True),
+                locked(container_path, exclusive=True),
+            ):
+                entries = _read(json_path)
+                if not entries:
+                    continue
+                container = _read(container_path)
+                kept: Dict[str, Any] = {}
+                for name, keys in entries.items():
+                    try:
+                        container[name] = _entry(kind, entry_pem(kind, keys), True)
+                    except ValueError:
+                        kept[name] = keys
+                _write_atomic(container_path, container)
+                if kept:
+                    _write_atomic(json_path, kept)
+                else:
+                    os.remove(json_path)
+                converted += len(entries) - len(kept)
+    bump_generation()
+    return converted
+
+
+def public_entries() -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(author, entry) of every public key, sharded or single-file"""
+    seen = set()
+    for author, _ in authors():
+        for name, keys in shard_entries(PUBLIC, author).items():
+            seen.add(name)
+            yield name, keys
+    for name, keys in _read(db_settings.public_key_storage).items():
+        if name not in seen:
+            yield name, keys
+
+
+def export_public(path: str) -> int:
+    """Merge every public shard into one JSON registry, returns its size"""
+    registry = {
+        name: {
+            PUBLIC: base64.b64encode(entry_pem(PUBLIC, keys)).decode("ascii"),
+            "fingerprint": keys["fingerprint"],
+        }
+        for name, keys in public_entries()
+    }
+    _write_atomic(path, registry)
+    return len(registry)
+
+
+def export_trust_table(path: str) -> int:
+    """
+    Write the public keys as a memory-mappable trust table, returns its size.
+    The table records the generation read before the keys, so a key
+    registered during the export leaves it marked stale
+    """
+    generation = current_generation()
+    return write_trust_table(
+        (
+            (name, keys["fingerprint"], entry_der(PUBLIC, keys))
+            for name, keys in public_entries()
+        ),
+        path,
+        generation,
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "migrate":
+        print(f"{migrate_legacy()} authors migrated to {db_settings.key_storage}")
+        print(
+            f"{db_settings.public_key_storage} and {db_settings.private_key_storage}"
+            " were kept, delete them once the shards are checked"
+        )
+    elif command == "convert":
+        print(f"{migrate_legacy()} authors migrated to {db_settings.key_storage}")
+        print(f"{convert_shards()} keys converted to {keyfile.SUFFIX} containers")
+    elif command == "export" and len(sys.argv) == 3:
+        print(f"{export_public(sys.argv[2])} authors written to {sys.argv[2]}")
+    elif command == "export-table" and len(sys.argv) == 3:
+        print(f"{export_trust_table(sys.argv[2])} keys written to {sys.argv[2]}")
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,292 @@
+"""
+Published transactions are sharded by manufacturer and by day:
+
+    <ledger_storage>/manifest.json
+    <ledger_storage>/<shard>/<YYYY-MM-DD>/<seq>.jsonl      (active / sealed)
+    <ledger_storage>/<shard>/<YYYY-MM-DD>/<seq>.jsonl.gz   (archived)
+
+A segment rolls over once it reaches `ledger_segment_max_bytes`. Cold segments are
+compacted into gzip archives made of independent members of `ledger_block_records`
+records each; the (first record, offset, length) of every member is kept in the
+manifest so a single record can be read back by decompressing only its block.
+
+Run compaction (e.g. daily from cron) and read the ledger back with
+
+    uv run python -m digital_signature.database.ledger compact
+    uv run python -m digital_signature.database.ledger scan [manufacturer] [since] [until]
+    uv run python -m digital_signature.database.ledger get <segment id> <position>
+
+`scan` prints one JSON payload per line; `since`/`until` are inclusive ISO
+days and "-" leaves a filter out.
+
+Appends and compaction rewrite the manifest under an exclusive lock on
+`manifest.json.lock`, so concurrent backend workers do not drop each other's
+segments; readers rely on the manifest being replaced by atomic rename.
+"""
+
+import bisect
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional
+from .connection import db_settings
+from .filelock import locked
+from ..utils.metrics import stage
+
+MANIFEST_NAME = "manifest.json"
+
+
+def shard_name(manufacturer: str) -> str:
+    """Filesystem-safe, collision-free directory name for a manufacturer"""
+    slug = re.sub(r"[^a-z0-9]+", "-", manufacturer.lower()).strip("-") or "unknown"
+    suffix = hashlib.sha256(manufacturer.lower().encode("utf-8")).hexdigest()[:8]
+    return f"{slug[:32]}-{suffix}"
+
+
+def _transaction_day(payload: Dict[str, Any]) -> str:
+    signed_at = payload.get("signed_at") or ""
+    try:
+        return datetime.datetime.strptime(signed_at[:10], "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return datetime.date.today().isoformat()
+
+
+def _manifest_path() -> str:
+    return os.path.join(db_settings.ledger_storage, MANIFEST_NAME)
+
+
+def load_manifest() -> Dict[str, Any]:
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"segments": []}
+
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    os.makedirs(db_settings.ledger_storage, exist_ok=True)
+    tmp_path = _manifest_path() + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=4)
+    os.replace(tmp_path, _manifest_path())
+
+
+def _find_active(manifest: Dict[str, Any], shard: str, day: str) -> Optional[Dict]:
+    for segment in reversed(manifest["segments"]):
+        if segment["shard"] == shard and segment["day"] == day:
+            return segment if segment["status"] == "active" else None
+    return None
+
+
+def _open_segment(
+    manifest: Dict[str, Any], manufacturer: str, shard: str, day: str
+) -> Dict[str, Any]:
+    seq = sum(
+        1 for s in manifest["segments"] if s["shard"] == shard and s["day"] == day
+    )
+    segment = {
+        "id": f"{shard}/{day}/{seq:05d}",
+        "manufacturer": manufacturer,
+        "shard": shard,
+        "day": day,
+        "path": os.path.join(shard, day, f"{seq:05d}.jsonl"),
+        "status": "active",
+    }
+    os.makedirs(os.path.join(db_settings.ledger_storage, shard, day), exist_ok=True)
+    manifest["segments"].append(segment)
+    return segment
+
+
+def append_transaction(payload: Dict[str, Any]) -> str:
+    """
+    Append a signed payload to the segment of its manufacturer/day.
+    Returns the id of the segment the record landed in.
+    """
+    with stage("ledger_write"), locked(_manifest_path(), exclusive=True):
+        return _append_transaction(payload)
+
+
+def _append_transaction(payload: Dict[str, Any]) -> str:
+    manufacturer = payload.get("metadata", {}).get("manufacturer", "") or "unknown"
+    shard = shard_name(manufacturer)
+    day = _transaction_day(payload)
+    line = (
+        json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n"
+    ).encode("utf-8")
+
+    manifest = load_manifest()
+    segment = _find_active(manifest, shard, day)
+    manifest_dirty = False
+
+    if segment is not None:
+        full_path = os.path.join(db_settings.ledger_storage, segment["path"])
+        try:
+            size = os.path.getsize(full_path)
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(line) > db_settings.ledger_segment_max_bytes:
+            # Roll over
+            segment["status"] = "sealed"
+            segment = None
+            manifest_dirty = True
+
+    if segment is None:
+        segment = _open_segment(manifest, manufacturer, shard, day)
+        manifest_dirty = True
+
+    with open(os.path.join(db_settings.ledger_storage, segment["path"]), "ab") as file:
+        file.write(line)
+
+    if manifest_dirty:
+        _save_manifest(manifest)
+    return segment["id"]
+
+
+def _archive_segment(segment: Dict[str, Any]) -> str:
+    """
+    Write the gzip archive and point the segment at it, returns the path of
+    the source file, to be removed once the manifest is saved
+    """
+    src_path = os.path.join(db_settings.ledger_storage, segment["path"])
+    dst_rel = segment["path"] + ".gz"
+    dst_path = os.path.join(db_settings.ledger_storage, dst_rel)
+
+    blocks: List[List[int]] = []  # [first_record, offset, length]
+    records = 0
+    with open(src_path, "rb") as src, open(dst_path + ".tmp", "wb") as dst:
+        block: List[bytes] = []
+        for line in src:
+            block.append(line)
+            if len(block) == db_settings.ledger_block_records:
+                member = gzip.compress(b"".join(block))
+                blocks.append([records, dst.tell(), len(member)])
+                dst.write(member)
+                records += len(block)
+                block = []
+        if block:
+            member = gzip.compress(b"".join(block))
+            blocks.append([records, dst.tell(), len(member)])
+            dst.write(member)
+            records += len(block)
+
+    os.replace(dst_path + ".tmp", dst_path)
+    segment.update(
+        {"path": dst_rel, "status": "archived", "records": records, "blocks": blocks}
+    )
+    return src_path
+
+
+def compact_segments(now: Optional[datetime.date] = None) -> int:
+    """
+    Archive every segment whose day is older than `ledger_cold_after_days`.
+    Returns the number of segments compacted.
+    """
+    today = now or datetime.date.today()
+    cutoff = (
+        today - datetime.timedelta(days=db_settings.ledger_cold_after_days)
+    ).isoformat()
+
+    with locked(_manifest_path(), exclusive=True):
+        manifest = load_manifest()
+        archived = [
+            _archive_segment(segment)
+            for segment in manifest["segments"]
+            if segment["status"] != "archived" and segment["day"] < cutoff
+        ]
+        if archived:
+            # Readers must never see a manifest pointing at a removed file
+            _save_manifest(manifest)
+        for src_path in archived:
+            os.remove(src_path)
+    return len(archived)
+
+
+def _select_segments(
+    manifest: Dict[str, Any],
+    manufacturer: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+) -> List[Dict[str, Any]]:
+    shard = shard_name(manufacturer) if manufacturer else None
+    return [
+        segment
+        for segment in manifest["segments"]
+        if (shard is None or segment["shard"] == shard)
+        and (since is None or segment["day"] >= since)
+        and (until is None or segment["day"] <= until)
+    ]
+
+
+def _iter_segment(segment: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    path = os.path.join(db_settings.ledger_storage, segment["path"])
+    opener = gzip.open if segment["status"] == "archived" else open
+    try:
+        with opener(path, "rb") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
+
+
+def scan_transactions(
+    manufacturer: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream published payloads, opening only the segments the manifest says can
+    match. `since`/`until` are inclusive ISO days (YYYY-MM-DD).
+    """
+    manifest = load_manifest()
+    for segment in _select_segments(manifest, manufacturer, since, until):
+        yield from _iter_segment(segment)
+
+
+def read_transaction(segment_id: str, position: int) -> Optional[Dict[str, Any]]:
+    """Random access to the `position`-th record of a segment"""
+    manifest = load_manifest()
+    segment = next((s for s in manifest["segments"] if s["id"] == segment_id), None)
+    if segment is None or position < 0:
+        return None
+
+    if segment["status"] != "archived":
+        for index, record in enumerate(_iter_segment(segment)):
+            if index == position:
+                return record
+        return None
+
+    blocks = segment["blocks"]
+    if position >= segment["records"]:
+        return None
+    block_index = bisect.bisect_right([b[0] for b in blocks], position) - 1
+    first_record, offset, length = blocks[block_index]
+
+    with open(os.path.join(db_settings.ledger_storage, segment["path"]), "rb") as file:
+        file.seek(offset)
+        lines = gzip.decompress(file.read(length)).splitlines()
+    return json.loads(lines[position - first_record])
+
+
+if __name__ == "__main__":
+    import sys
+
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+    if command == "compact" and not args:
+        print(
+            f"{compact_segments()} segments compacted in {db_settings.ledger_storage}"
+        )
+    elif command == "scan" and len(args) <= 3:
+        filters = [arg if arg != "-" else None for arg in args]
+        for record in scan_transactions(*filters):
+            print(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+    elif command == "get" and len(args) == 2 and args[1].isdigit():
+        record = read_transaction(args[0], int(args[1]))
+        if record is None:
+            sys.exit(f"no record {args[1]} in segment {args[0]}")
+        print(json.dumps(record, ensure_ascii=False, indent=4))
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import (
+    Column,
+    Engine,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    event,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex
+from .connection import db_settings
+
+metadata = MetaData()
+
+transactions = Table(
+    "transactions",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("product_id", String),
+    Column("batch", String),
+    Column("manufacturer", String),
+    Column("production_date", String),
+    Column("expiry_date", String),
+    Column("signed_at", String),
+    Column("algorithm", String),
+    Column("digest", String),
+    Column("pubkey_fingerprint", String),
+    Column("payload", Text, nullable=False),
+    Index("ix_transactions_product_id", "product_id"),
+    Index("ix_transactions_batch", "batch"),
+    Index("ix_transactions_expiry_date", "expiry_date"),
+    Index("ix_transactions_signed_at", "signed_at"),
+)
+
+# Manufacturer filters ignore case, like the key store and the ledger. Also
+# created "IF NOT EXISTS" on its own, so databases made before it get it too
+manufacturer_index = Index(
+    "ix_transactions_lower_manufacturer_signed_at",
+    func.lower(transactions.c.manufacturer),
+    transactions.c.signed_at,
+)
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def _enable_wal(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def get_engine() -> Engine:
+    """Lazily create the SQLite engine (WAL mode) and the schema"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            url = make_url(db_settings.transaction_database_url)
+            if url.database and url.database != ":memory:":
+                os.makedirs(os.path.dirname(url.database) or ".", exist_ok=True)
+
+            engine = create_engine(url)
+            event.listen(engine, "connect", _enable_wal)
+            metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(CreateIndex(manufacturer_index, if_not_exists=True))
+            _engine = engine
+    return _engine
+
+
+def _to_row(payload: Dict[str, Any]) -> Dict[str, Any]:
+    product = payload.get("metadata", {})
+    return {
+        "product_id": product.get("product_id"),
+        "batch": product.get("batch"),
+        "manufacturer": product.get("manufacturer"),
+        "production_date": product.get("production_date"),
+        "expiry_date": product.get("expiry_date"),
+        "signed_at": payload.get("signed_at"),
+        "algorithm": payload.get("algorithm"),
+        "digest": payload.get("digest"),
+        "pubkey_fingerprint": payload.get("pubkey_fingerprint"),
+        "payload": json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+    }
+
+
+def insert_transactions(payloads: Iterable[Dict[str, Any]]) -> int:
+    """
+    Store signed payloads in one transaction (a single executemany).
+    Returns the number of inserted rows.
+    """
+    rows: List[Dict[str, Any]] = [_to_row(payload) for payload in payloads]
+    if not rows:
+        return 0
+
+    with get_engine().begin() as conn:
+        conn.execute(insert(transactions), rows)
+    return len(rows)
+
+
+def query_transactions(
+    product_id: Optional[str] = None,
+    batch: Optional[str] = None,
+    manufacturer: Optional[str] = None,
+    expiry_from: Optional[str] = None,
+    expiry_to: Optional[str] = None,
+    signed_from: Optional[str] = None,
+    signed_to: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> Dict[str, Any]:
+    """
+    Search published payloads, newest first.
+    Dates are ISO strings and every bound is inclusive.
+    Returns {"items": [payload, ...], "page": int, "page_size": int, "total": int}
+    """
+    page = max(page, 1)
+    page_size = max(page_size, 1)
+
+    conditions = []
+    if product_id:
+        conditions.append(transactions.c.product_id == product_id)
+    if batch:
+        conditions.append(transactions.c.batch == batch)
+    if manufacturer:
+        conditions.append(
+            func.lower(transactions.c.manufacturer) == func.lower(manufacturer)
+        )
+    if expiry_from:
+        conditions.append(transactions.c.expiry_date >= expiry_from)
+    if expiry_to:
+        conditions.append(transactions.c.expiry_date <= expiry_to)
+    if signed_from:
+        conditions.append(transactions.c.signed_at >= signed_from)
+    if signed_to:
+        # "YYYY-MM-DD" must include the whole day
+        if len(signed_to) == 10:
+            signed_to += " 23:59:59"
+        conditions.append(transactions.c.signed_at <= signed_to)
+
+    items_query = (
+        select(transactions.c.payload)
+        .where(*conditions)
+        .order_by(transactions.c.signed_at.desc(), transactions.c.id.desc())
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+    )
+    total_query = select(func.count()).select_from(transactions).where(*conditions)
+
+    with get_engine().connect() as conn:
+        total = conn.execute(total_query).scalar_one()
+        items = [json.loads(row) for row in conn.execute(items_query).scalars()]
+
+    return {"items": items, "page": page, "page_size": page_size, "total": total}
+
+
+def latest_transaction(**filters: Any) -> Optional[Dict[str, Any]]:
+    """Most recently signed payload matching the given filters"""
+    items = query_transactions(page=1, page_size=1, **filters)["items"]
+    return items[0] if items else None
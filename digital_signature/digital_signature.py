@@ -3,6 +3,7 @@ import reflex as rx
 from .pages.recipient import recipient
 from .pages.sender import sender
 from .pages import landing
+from .api.routes import api
 
 app = rx.App(
     style={"font_family": "Outfit"},
@@ -10,4 +11,5 @@ app = rx.App(
         "https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap"
     ],
     theme=rx.theme(accent_color="violet"),
+    api_transformer=api,
 )
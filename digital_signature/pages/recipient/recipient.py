@@ -1,5 +1,6 @@
 import reflex as rx
 from .state import AppState
+from ...database.connection import db_settings
 
 from ...components.nav import go_back, to_sender
 from ...components.box import meta_box, data_viewer_box
@@ -101,6 +102,15 @@ def product_info() -> rx.Component:
                     ),
                 ),
                 id="upload",
+                # Checked again server-side while streaming, see utils/uploads.py
+                accept={
+                    "image/png": [".png"],
+                    "image/jpeg": [".jpg", ".jpeg"],
+                    "image/gif": [".gif"],
+                    "image/bmp": [".bmp"],
+                    "image/webp": [".webp"],
+                },
+                max_size=db_settings.upload_max_bytes,
                 on_drop=AppState.upload_qr(rx.upload_files("upload")),
             ),
             align="center",
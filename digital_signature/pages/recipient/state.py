@@ -1,18 +1,18 @@
 import reflex as rx
 import json
-from pyzbar.pyzbar import decode
-from PIL import Image
-from ...utils.decrypt import (
-    authenticate_author_key,
-    verify_signed_product_payload,
-    verify_message_digest,
-)
+import dataclasses
+from ...utils import storage
+from ...utils.decrypt import VerificationResult
 from typing import Dict, Any, List
-from ...database.connection import db_settings
+from ...utils.metrics import stage
+from ...utils.slow_events import timed_event, timed_var
+from ...utils.tracing import span
+from ...utils.uploads import save_preview, spool_upload
 
 
 class AppState(rx.State):
-    received_payload: Dict[str, Any] = {}
+    # Backend-only, the page renders the projections below
+    _received_payload: Dict[str, Any] = {}
     preview_url: str = ""
 
     # Public key authentication
@@ -21,84 +21,111 @@ class AppState(rx.State):
     key_checked: bool = False  # Detect whether the user has checked the keys or not
 
     # Signature
-    signature: str = ""
+    _signature: str = ""
 
-    @rx.event
-    def load_payload(self):
-        with open(db_settings.transaction_storage, "r") as file:
-            data = json.load(file)
-
-        self.received_payload = data
-        self.public_key = self.received_payload.get("pubkey", "")
-        self.signature = self.received_payload.get("signature", "")
-        self.manufacturer = self.received_payload.get("metadata", {}).get(
+    # Verification outcome, computed once per payload
+    _verification: VerificationResult = VerificationResult()
+
+    async def _set_received_payload(self, data: Dict[str, Any]) -> None:
+        self._received_payload = data
+        self.public_key = self._received_payload.get("pubkey", "")
+        self._signature = self._received_payload.get("signature", "")
+        self.manufacturer = self._received_payload.get("metadata", {}).get(
             "manufacturer", ""
         )
+        with span("verify", manufacturer=self.manufacturer):
+            self._verification = await storage.verify_received_payload(
+                payload=self._received_payload,
+                public_key=self.public_key,
+                author=self.manufacturer,
+            )
 
     @rx.event
-    async def upload_qr(self, files: List[rx.UploadFile]):
-        """Decode uploaded QR image"""
-        for file in files:
-            upload_dir = rx.get_upload_dir()
-
-            upload_dir.mkdir(parents=True, exist_ok=True)
-            path = upload_dir / file.name
+    @timed_event
+    async def load_payload(self):
+        data = await storage.latest_transaction()
+        if data is None:
+            # Payloads published before the transaction store existed
+            data = await storage.load_transaction()
 
-            with open(path, "wb") as f:
-                f.write(await file.read())
-            self.preview_url = f"/{path}"
+        await self._set_received_payload(data)
 
-            img = Image.open(path)
-            decoded = decode(img)
-            value = decoded[0].data.decode("ascii")
+    @rx.event
+    @timed_event
+    async def upload_qr(self, files: List[rx.UploadFile]):
+        """Decode uploaded QR image"""
+        # Imaging libraries are only needed here, keep them off the import path
+        from pyzbar.pyzbar import decode
+        from PIL import Image
 
-            data = json.loads(value)
-            self.received_payload = data
-            self.public_key = self.received_payload.get("pubkey", "")
-            self.signature = self.received_payload.get("signature", "")
-            self.manufacturer = self.received_payload.get("metadata", {}).get(
-                "manufacturer", ""
-            )
-            self.key_checked = True
+        for file in files:
+            with span("upload_qr", file=file.name):
+                with span("upload_spool"):
+                    try:
+                        buffer = await spool_upload(file)
+                    except ValueError as error:
+                        return rx.toast.error(str(error))
+
+                with buffer:
+                    with span("upload_write"):
+                        path = await storage.run_io(
+                            save_preview, buffer, rx.get_upload_dir(), file.name
+                        )
+                    self.preview_url = f"/{path}"
+
+                    with stage("qr_decode"), span("qr_decode"):
+                        # PIL reads the (possibly spilled) buffer while decoding
+                        decoded = await storage.run_io(
+                            lambda: decode(Image.open(buffer))
+                        )
+                value = decoded[0].data.decode("ascii")
+
+                with span("json_loads", size=len(value)):
+                    data = json.loads(value)
+                await self._set_received_payload(data)
+                self.key_checked = True
 
     @rx.event
+    @timed_event
     def set_input_key(self, value: str):
         self.input_key = value
 
     @rx.var
     def authenticate_public_key(self) -> bool:
-        if self.public_key and self.manufacturer:
-            return authenticate_author_key(
-                public_key=self.public_key, author=self.manufacturer
-            )
-        return False
+        return self._verification.key_authentic
 
     @rx.var
     def verify_digest(self) -> bool:
-        return verify_message_digest(payload=self.received_payload)
+        return self._verification.digest_valid
 
     @rx.var
     def verify_signature(self) -> bool:
-        if (
-            verify_signed_product_payload(payload=self.received_payload)
-            and self.verify_digest
-        ):
-            return True
-
-        return False
+        return self._verification.signature_valid
 
     @rx.event
+    @timed_event
     def set_key_checked(self):
         if not self.key_checked:
             self.key_checked = True
 
     @rx.event
-    def set_public_key(self, value: str):
+    @timed_event
+    async def set_public_key(self, value: str):
         self.public_key = value
+        # Only the registry lookup depends on the typed key
+        self._verification = dataclasses.replace(
+            self._verification,
+            key_authentic=bool(self.public_key and self.manufacturer)
+            and await storage.authenticate_author_key(
+                public_key=self.public_key, author=self.manufacturer
+            ),
+        )
 
     @rx.var
     def payload_meta(self) -> Dict[str, Any]:
-        return self.received_payload.get("metadata", {})
+        with timed_var("recipient:AppState.payload_meta") as timer:
+            timer.value = self._received_payload.get("metadata", {})
+        return timer.value
 
     @rx.var
     def payload_authority(self) -> Dict[str, Any]:
@@ -109,4 +136,8 @@ class AppState(rx.State):
             "algorithm",
             "signed_at",
         ]
-        return {key: self.received_payload.get(key, None) for key in author_metadata}
+        with timed_var("recipient:AppState.payload_authority") as timer:
+            timer.value = {
+                key: self._received_payload.get(key, None) for key in author_metadata
+            }
+        return timer.value
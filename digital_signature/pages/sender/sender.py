@@ -4,6 +4,25 @@ from ...components.nav import go_back, to_recipient
 from ...components.box import meta_box, data_viewer_box
 
 
+def download_qr() -> rx.event.EventSpec:
+    """
+    Save the QR image as qr_code.png. The /qr/<key>.png route is on the API
+    host (another origin than the page), where browsers ignore the anchor
+    `download` attribute, so the image is fetched into a same-origin Blob first
+    """
+    return rx.call_script(
+        f'fetch("{AppState.qr_url}")'
+        ".then((response) => response.blob())"
+        ".then((blob) => {"
+        'const link = document.createElement("a");'
+        "link.href = URL.createObjectURL(blob);"
+        'link.download = "qr_code.png";'
+        "link.click();"
+        "setTimeout(() => URL.revokeObjectURL(link.href), 0);"
+        "})"
+    )
+
+
 def input_product_info(*args, **kwargs) -> rx.Component:
     return rx.vstack(
         rx.heading("Product Info", size="7"),
@@ -170,11 +189,9 @@ def generate_keys(*args, **kwargs) -> rx.Component:
                 rx.text("Private Key", **kwargs["key_text_props"]),
                 rx.scroll_area(
                     rx.cond(
-                        AppState.private_key,
+                        AppState.public_key_fingerprint,
                         rx.text(
-                            AppState.private_key,
-                            word_break="break-all",
-                            white_space="pre-wrap",
+                            "Registered, kept on the server",
                             padding="0.5em",
                         ),
                         "N/A",
@@ -183,12 +200,12 @@ def generate_keys(*args, **kwargs) -> rx.Component:
                 ),
             ),
             rx.card(
-                rx.text("Public Key", **kwargs["key_text_props"]),
+                rx.text("Public Key (SHA-256)", **kwargs["key_text_props"]),
                 rx.scroll_area(
                     rx.cond(
-                        AppState.public_key,
+                        AppState.public_key_fingerprint,
                         rx.text(
-                            AppState.public_key,
+                            AppState.public_key_fingerprint,
                             word_break="break-all",
                             white_space="pre-wrap",
                             padding="0.5em",
@@ -217,7 +234,7 @@ def publish_payload(*args, **kwargs) -> rx.Component:
             on_click=AppState.sign_payload,
         ),
         rx.cond(
-            AppState.signed_payload,
+            AppState.has_signed_payload,
             display_signed_payload(**kwargs),
             rx.fragment(),
         ),
@@ -251,7 +268,7 @@ def display_signed_payload(*args, **kwargs) -> rx.Component:
                 rx.divider(),
                 rx.center(
                     rx.cond(
-                        AppState.signed_payload,
+                        AppState.has_signed_payload,
                         rx.vstack(
                             rx.grid(
                                 rx.foreach(
@@ -323,13 +340,16 @@ def display_signed_payload(*args, **kwargs) -> rx.Component:
                                 align_items="start",
                                 spacing="2",
                             ),
-                            # Download QR code
+                            # QR code, served (and cached) by the /qr route
+                            rx.image(
+                                src=AppState.qr_url,
+                                width="250px",
+                                border_radius="md",
+                                border="1px solid gray",
+                            ),
                             rx.button(
                                 "Download",
-                                on_click=rx.download(
-                                    data=AppState.generate_qr,
-                                    filename="qr_code.png",
-                                ),
+                                on_click=download_qr(),
                                 id="download button",
                             ),
                             width="100%",
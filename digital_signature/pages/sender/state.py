@@ -1,15 +1,11 @@
 import reflex as rx
-import json
-import base64
-from ...utils.helper import (
-    generate_rsa_keypair,
-    load_private_key,
-    load_public_keys,
-    register_key,
-    generate_qr,
-)
+from reflex.config import get_config
+from ...utils.helper import generate_rsa_keypair, sha256_digest
+from ...utils import qr_cache, storage
 from ...utils.encrypt import sign_product
 from ...database.connection import db_settings
+from ...utils.slow_events import timed_event, timed_var
+from ...utils.tracing import span
 from typing import Dict, Any, List
 
 
@@ -23,65 +19,79 @@ class AppState(rx.State):
     expiry_date: str = "2026-09-30"
     certificate: Dict[str, Any]
 
-    # Keys
-    private_key: str = ""
-    public_key: str = ""
+    # Keys live in the keystore only, the page shows the public key fingerprint
+    public_key_fingerprint: str = ""
 
     # Settings
     algorithms: List[str] = ["rsa", "ecdsa"]
     selected_algorithm: str = "rsa"
 
-    # Payload
-    signed_payload: Dict[str, Any] = {}
+    # Payload: backend-only, the page renders the projections below
+    _signed_payload: Dict[str, Any] = {}
+    _qr_key: str = ""
 
     @rx.event
+    @timed_event
     def set_product_id(self, value: str):
         self.product_id = value
 
     @rx.event
+    @timed_event
     def set_batch(self, value: str):
         self.batch = value
 
     @rx.event
+    @timed_event
     def set_manufacturer(self, value: str):
         if value is not None:
             self.manufacturer = value
 
     @rx.event
+    @timed_event
     def set_origin(self, value: str):
         self.origin = value
 
     @rx.event
+    @timed_event
     def set_expired_date(self, value: str):
         self.expiry_date = value
 
     @rx.event
+    @timed_event
     def set_production_date(self, value: str):
         self.production_date = value
 
     @rx.event
-    def randomize_keys(self) -> None:
+    @timed_event
+    async def randomize_keys(self) -> None:
         if self.manufacturer != "":
-            pem_private, pem_public = generate_rsa_keypair(key_size=3072)
-            register_key(
+            pem_private, pem_public = await storage.run_io(
+                generate_rsa_keypair, key_size=3072
+            )
+            await storage.register_key(
                 private_key_pem=pem_private,
                 public_key_pem=pem_public,
                 author=self.manufacturer,
             )
-            self.private_key = base64.b64encode(pem_private).decode("ascii")
-            self.public_key = base64.b64encode(pem_public).decode("ascii")
+            self.public_key_fingerprint = sha256_digest(pem_public)
         else:
             return None
 
     @rx.event
+    @timed_event
     def clear_keys(self):
-        self.private_key = ""
-        self.public_key = ""
+        self.public_key_fingerprint = ""
 
     @rx.event
-    def sign_payload(self):
-        public_pem, _ = load_public_keys(author=self.manufacturer)
-        private_pem = load_private_key(author=self.manufacturer)
+    @timed_event
+    async def sign_payload(self):
+        with span("sign_payload", algorithm=self.selected_algorithm):
+            await self._sign_payload()
+
+    async def _sign_payload(self) -> None:
+        with span("key_load"):
+            public_pem, _ = await storage.load_public_keys(author=self.manufacturer)
+            private_key = await storage.load_signing_key(author=self.manufacturer)
 
         product_payload: Dict[str, Any] = {
             "product_id": self.product_id,
@@ -92,27 +102,47 @@ class AppState(rx.State):
             "expiry_date": self.expiry_date,
         }
 
-        self.signed_payload: Dict[str, Any] = sign_product(
-            metadata=product_payload,
-            private_pem=private_pem,
-            public_pem=public_pem,
-            algorithm=self.selected_algorithm,
-        )
+        with span("sign_product"):
+            self._signed_payload = sign_product(
+                metadata=product_payload,
+                private_pem=private_key,
+                public_pem=public_pem,
+                algorithm=self.selected_algorithm,
+            )
 
-        self.publish_product()
+        await self.publish_product()
+
+    async def publish_product(self) -> None:
+        if self._signed_payload:
+            with span("publish"):
+                await storage.write_json(
+                    db_settings.transaction_storage, self._signed_payload
+                )
+                with span("ledger_write"):
+                    await storage.append_transaction(self._signed_payload)
+                with span("store_insert"):
+                    await storage.insert_transactions([self._signed_payload])
+                with span("qr_register"):
+                    self._qr_key = await storage.run_io(
+                        qr_cache.register, self._signed_payload
+                    )
 
-    def publish_product(self) -> None:
-        if self.signed_payload:
-            with open(db_settings.transaction_storage, "w", encoding="utf-8") as file:
-                json.dump(self.signed_payload, file, indent=4)
+    @rx.var
+    def has_signed_payload(self) -> bool:
+        return bool(self._signed_payload)
 
     @rx.var
-    def generate_qr(self) -> str:
-        return generate_qr(self.signed_payload)
+    def qr_url(self) -> str:
+        """Cacheable URL of the payload's QR image (rendered on first request)"""
+        if not self._qr_key:
+            return ""
+        return f"{get_config().api_url}/qr/{self._qr_key}.png"
 
     @rx.var
     def payload_meta(self) -> Dict[str, Any]:
-        return self.signed_payload.get("metadata", {})
+        with timed_var("sender:AppState.payload_meta") as timer:
+            timer.value = self._signed_payload.get("metadata", {})
+        return timer.value
 
     @rx.var
     def payload_authority(self) -> Dict[str, Any]:
@@ -124,4 +154,8 @@ class AppState(rx.State):
             "algorithm",
             "signed_at",
         ]
-        return {key: self.signed_payload.get(key, None) for key in author_metadata}
+        with timed_var("sender:AppState.payload_authority") as timer:
+            timer.value = {
+                key: self._signed_payload.get(key, None) for key in author_metadata
+            }
+        return timer.value
@@ -0,0 +1,136 @@
+"""
+Helpers shared by the batch command-line tools: streaming record readers,
+an order-preserving bounded map over an executor and a progress/ETA line.
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+
+class Progress:
+    """Throughput & ETA on stderr, ETA derived from the bytes consumed"""
+
+    def __init__(self, total_bytes: int = 0, interval: float = 1.0, stream: IO = None):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.items = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._last_report = 0.0
+        self._line_width = 0
+
+    def consumed(self, nbytes: int) -> None:
+        self.bytes += nbytes
+
+    def advance(self, items: int = 1) -> None:
+        self.items += items
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.items / elapsed if elapsed > 0 else 0.0
+
+    def report(self, final: bool = False) -> None:
+        line = f"{self.items} items | {self.rate():.1f} items/s"
+        if self.total_bytes and not final:
+            done = min(self.bytes / self.total_bytes, 1.0)
+            elapsed = time.monotonic() - self.started
+            eta = elapsed * (1 - done) / done if done > 0 else 0.0
+            line += f" | {done:.0%} | ETA {time.strftime('%H:%M:%S', time.gmtime(eta))}"
+        self._line_width = 0 if final else len(line)
+        self.stream.write("\r" + line + ("\n" if final else ""))
+        self.stream.flush()
+
+    def note(self, message: str) -> None:
+        """Print a message on its own line, over the progress line"""
+        self.stream.write("\r" + message.ljust(self._line_width) + "\n")
+        self.stream.flush()
+        self._line_width = 0
+
+    def finish(self) -> None:
+        self.report(final=True)
+
+
+def iter_lines(path: str, progress: Optional[Progress] = None) -> Iterator[str]:
+    """Stream decoded lines, counting the bytes read towards `progress`"""
+    encoding = "utf-8-sig"  # drop a BOM on the first line only
+    with open(path, "rb") as file:
+        for raw in file:
+            if progress is not None:
+                progress.consumed(len(raw))
+            yield raw.decode(encoding)
+            encoding = "utf-8"
+
+
+def iter_records(
+    path: str, fmt: Optional[str] = None, progress: Optional[Progress] = None
+) -> Iterator[Any]:
+    """
+    Stream records from a CSV (header row, one record per row) or JSONL file
+    one at a time. `fmt` defaults to the file extension.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    lines = iter_lines(path, progress)
+
+    if fmt == "csv":
+        for row in csv.DictReader(lines):
+            yield {
+                key: value for key, value in row.items() if key and value is not None
+            }
+    elif fmt in ("jsonl", "ndjson", "json"):
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_pending: int,
+) -> Iterator[Any]:
+    """
+    Like executor.map, in input order, but pulls at most `max_pending` items
+    ahead of the consumer so memory stays constant for arbitrarily long inputs
+    """
+    pending: Deque[Future] = deque()
+    for item in items:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most `size` items"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def write_jsonl(stream: IO, record: Dict[str, Any]) -> None:
+    stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
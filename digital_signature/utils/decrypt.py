@@ -1,44 +1,86 @@
 import base64
 import binascii
-import json
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 from .helper import (
     canonicalize_metadata,
+    metadata_digest,
     sha256_digest,
 )
+from .digests import (
+    DIGEST_ALGORITHMS,
+    LEGACY_DIGEST_ALG,
+    SIGNATURE_SUPPORT,
+    signature_hash,
+)
+from ..core.verifier import STAGE_DIGEST, Verdict, verify
+from .metrics import stage
+from .tracing import span
+from ..core.trusttable import TrustTable
+from ..database import keystore
 from ..database.connection import db_settings
-from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric.padding import PSS, MGF1
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
 from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidSignature
+from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
 
 
-def rsa_verify(public_pem: bytes, message: bytes, signature: bytes) -> bool:
+def rsa_verify(
+    public_pem: bytes,
+    message: bytes,
+    signature: bytes,
+    prehashed: bool = False,
+    digest_alg: str = LEGACY_DIGEST_ALG,
+) -> bool:
     """
     Verify RSA-PSS
+    prehashed: `message` is already the `digest_alg` digest of the message
     """
-    public_key = serialization.load_pem_public_key(
-        public_pem, backend=default_backend()
-    )
-    try:
-        public_key.verify(
-            signature,
-            message,
-            PSS(mgf=MGF1(hashes.SHA256()), salt_length=hashes.SHA256().digest_size),
-            hashes.SHA256(),
+    if digest_alg not in SIGNATURE_SUPPORT["RSA"]:
+        return False
+    with stage("key_load"):
+        public_key = serialization.load_pem_public_key(
+            public_pem, backend=default_backend()
         )
+    hash_algorithm = signature_hash(digest_alg)
+    try:
+        with stage("verify"):
+            public_key.verify(
+                signature,
+                message,
+                PSS(mgf=MGF1(hash_algorithm), salt_length=hash_algorithm.digest_size),
+                Prehashed(hash_algorithm) if prehashed else hash_algorithm,
+            )
         return True
     except InvalidSignature:
         return False
 
 
-def ecdsa_verify(public_pem: bytes, message: bytes, signature: bytes) -> bool:
-    public_key = serialization.load_pem_public_key(
-        public_pem, backend=default_backend()
-    )
+def ecdsa_verify(
+    public_pem: bytes,
+    message: bytes,
+    signature: bytes,
+    prehashed: bool = False,
+    digest_alg: str = LEGACY_DIGEST_ALG,
+) -> bool:
+    if digest_alg not in SIGNATURE_SUPPORT["ECDSA"]:
+        return False
+    with stage("key_load"):
+        public_key = serialization.load_pem_public_key(
+            public_pem, backend=default_backend()
+        )
+    hash_algorithm = signature_hash(digest_alg)
     try:
-        public_key.verify(signature, message, ec.ECDSA(hashes.SHA256()))
+        with stage("verify"):
+            public_key.verify(
+                signature,
+                message,
+                ec.ECDSA(Prehashed(hash_algorithm) if prehashed else hash_algorithm),
+            )
         return True
     except InvalidSignature:
         return False
@@ -55,47 +97,196 @@ def verify_signed_product_payload(payload: Dict) -> bool:
     signature_b64 = payload.get("signature", None)
     pub_b64 = payload.get("pubkey", None)
     algorithm = payload.get("algorithm", "RSA")
-    signature = base64.b64decode(signature_b64)
-    public_pem = base64.b64decode(pub_b64)
+    digest_alg = payload.get("digest_alg", LEGACY_DIGEST_ALG)
+    # digest_alg comes from the payload: an unknown one, or one the algorithm
+    # cannot sign with, fails the check instead of raising
+    if (
+        algorithm in SIGNATURE_SUPPORT
+        and digest_alg not in SIGNATURE_SUPPORT[algorithm]
+    ):
+        return False
+    with stage("base64"):
+        signature = base64.b64decode(signature_b64)
+        public_pem = base64.b64decode(pub_b64)
     message = canonicalize_metadata(metadata)
 
     if algorithm == "RSA":
-        return rsa_verify(public_pem, message, signature)
+        return rsa_verify(public_pem, message, signature, digest_alg=digest_alg)
     elif algorithm == "ECDSA":
-        return ecdsa_verify(public_pem, message, signature)
+        return ecdsa_verify(public_pem, message, signature, digest_alg=digest_alg)
     else:
         raise ValueError("Unsupported algorithm for verification")
 
 
+_trust_table: Optional[TrustTable] = None
+
+
+def _exported_trust_table() -> Optional[TrustTable]:
+    global _trust_table
+    path = db_settings.trust_table_storage
+    if not path:
+        return None
+    if _trust_table is None or _trust_table.path != path:
+        _trust_table = TrustTable(path)
+    return _trust_table
+
+
+def is_fingerprint_registered(fingerprint: str, author: str) -> bool:
+    """
+    Look up a public key fingerprint in the author registry: the exported
+    trust table (binary search, no file read) while it was exported at the
+    key store's current generation, else the author's shard
+    """
+    trust_table = _exported_trust_table()
+    if trust_table is not None:
+        try:
+            if trust_table.generation == keystore.current_generation():
+                return trust_table.is_trusted(fingerprint, author)
+        except (OSError, ValueError):
+            # Unreadable or not a trust table: the shards still answer
+            pass
+    with span("key_lookup"):
+        data = keystore.shard_entries(keystore.PUBLIC, author)
+
+    for registered_author, keys in data.items():
+        if (
+            fingerprint == keys["fingerprint"]
+            and author.lower() == registered_author.lower()
+        ):
+            return True
+    return False
+
+
 def authenticate_author_key(public_key: str, author: str) -> bool:
     if not public_key:
         return False
     try:
         public_key_pem: bytes = base64.b64decode(public_key)
-        hashed_pubkey: str = sha256_digest(data=public_key_pem)
-
-        with open(db_settings.public_key_storage, "r") as file:
-            data: Dict[str, Any] = json.load(file)
-            for registered_author, keys in data.items():
-                if (
-                    hashed_pubkey == keys["fingerprint"]
-                    and author.lower() == registered_author.lower()
-                ):
-                    return True
-            return False
-
-    except (FileNotFoundError, json.JSONDecodeError, binascii.Error):
+    except binascii.Error:
         return False
 
+    hashed_pubkey: str = sha256_digest(data=public_key_pem)
+    return is_fingerprint_registered(fingerprint=hashed_pubkey, author=author)
+
 
 def verify_message_digest(payload: Dict) -> bool:
     metadata = payload.get("metadata", {})
     received_digest = payload.get("digest", None)
-    if not metadata or not received_digest:
+    digest_alg = payload.get("digest_alg", LEGACY_DIGEST_ALG)
+    if not metadata or not received_digest or digest_alg not in DIGEST_ALGORITHMS:
         return False
 
     # Perform hash on received data & compare with sent data
-    message: bytes = canonicalize_metadata(metadata)
-    computed_digest: str = sha256_digest(data=message)
+    computed_digest: str = metadata_digest(metadata, digest_alg=digest_alg).hex()
 
     return computed_digest == received_digest
+
+
+_VERIFIERS = {"RSA": rsa_verify, "ECDSA": ecdsa_verify}
+
+# Same fields as core.verifier.Verdict, kept under the app's name
+PayloadVerification = Verdict
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    key_authentic: bool = False
+    digest_valid: bool = False
+    signature_valid: bool = False
+
+
+class _KeyRegistry:
+    """The app's key store as a core.verifier trust source"""
+
+    def is_trusted(self, fingerprint: str, author: str) -> bool:
+        return is_fingerprint_registered(fingerprint=fingerprint, author=author)
+
+
+_KEY_REGISTRY = _KeyRegistry()
+
+
+def _traced_digest(metadata: Dict, digest_alg: str) -> bytes:
+    with span("digest", digest_alg=digest_alg):
+        return metadata_digest(metadata, digest_alg=digest_alg)
+
+
+VERIFICATION_CACHE_SIZE = 1024
+
+# (signature, digest, public PEM, algorithm, digest_alg) -> signature_valid
+_signature_cache: "OrderedDict[Tuple, bool]" = OrderedDict()
+_signature_lock = threading.Lock()
+
+
+def _verify_signature_cached(
+    algorithm: str,
+    public_pem: bytes,
+    message_digest: bytes,
+    signature: bytes,
+    digest_alg: str,
+) -> bool:
+    """
+    Only called once the digest matched: the metadata is then pinned by
+    `digest`, so the verdict can be cached by signature & digest.
+    """
+    cache_key = (signature, message_digest, public_pem, algorithm, digest_alg)
+    with _signature_lock:
+        cached = _signature_cache.get(cache_key)
+        if cached is not None:
+            _signature_cache.move_to_end(cache_key)
+            return cached
+
+    try:
+        with span("signature_verify", algorithm=algorithm, digest_alg=digest_alg):
+            signature_valid = _VERIFIERS[algorithm](
+                public_pem,
+                message_digest,
+                signature,
+                prehashed=True,
+                digest_alg=digest_alg,
+            )
+    except (ValueError, TypeError, UnsupportedAlgorithm):
+        # Malformed key, key type not matching the algorithm, or a hash the
+        # key type cannot sign with
+        signature_valid = False
+
+    with _signature_lock:
+        _signature_cache[cache_key] = signature_valid
+        if len(_signature_cache) > VERIFICATION_CACHE_SIZE:
+            _signature_cache.popitem(last=False)
+    return signature_valid
+
+
+def verify_payload(
+    payload: Dict, author: Optional[str] = None, check_registry: bool = True
+) -> PayloadVerification:
+    """
+    Single-pass verification (core.verifier.verify): structure -> digest ->
+    registry -> signature, with the app's key registry, traced digest and
+    signature cache plugged in.
+    `author` defaults to the manufacturer named in the metadata.
+    """
+    return verify(
+        payload,
+        trust_store=_KEY_REGISTRY if check_registry else None,
+        author=author,
+        digest=_traced_digest,
+        check_signature=_verify_signature_cached,
+    )
+
+
+def verify_received_payload(
+    payload: Dict, public_key: str, author: str
+) -> VerificationResult:
+    """
+    Run every recipient-side check once and bundle the outcome.
+    The key registry lookup is not cached since keys can be (re)registered.
+    """
+    integrity = verify_payload(payload, check_registry=False)
+    key_authentic = bool(public_key and author) and authenticate_author_key(
+        public_key=public_key, author=author
+    )
+    return VerificationResult(
+        key_authentic=key_authentic,
+        digest_valid=STAGE_DIGEST in integrity.passed,
+        signature_valid=integrity.valid,
+    )
@@ -0,0 +1,58 @@
+"""
+Per-platform default digest algorithm. The algorithm tables live in
+core/digests.py and are re-exported here.
+"""
+
+import json
+import platform
+from functools import lru_cache
+from typing import Dict
+from ..core.digests import (
+    DIGEST_ALGORITHMS,
+    LEGACY_DIGEST_ALG,
+    SIGNATURE_SUPPORT,
+    new_hasher,
+    signature_hash,
+)
+from ..database.connection import db_settings
+
+__all__ = [
+    "DIGEST_ALGORITHMS",
+    "LEGACY_DIGEST_ALG",
+    "SIGNATURE_SUPPORT",
+    "default_digest_alg",
+    "new_hasher",
+    "platform_key",
+    "signature_hash",
+]
+
+
+def platform_key() -> str:
+    return (
+        f"{platform.system()}-{platform.machine()}-{platform.python_implementation()}"
+    )
+
+
+@lru_cache(maxsize=None)
+def _platform_defaults() -> Dict[str, str]:
+    try:
+        with open(db_settings.digest_defaults_storage, "r") as file:
+            return json.load(file).get(platform_key(), {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def default_digest_alg(algorithm: str = "RSA") -> str:
+    """
+    Configured digest algorithm, else the one benchmarked fastest on this
+    platform (see benchmarks/bench_digest.py), else SHA-256
+    """
+    algorithm = algorithm.upper()
+    supported = SIGNATURE_SUPPORT.get(algorithm, ())
+    for candidate in (
+        db_settings.digest_algorithm,
+        _platform_defaults().get(algorithm),
+    ):
+        if candidate and candidate in supported:
+            return candidate
+    return LEGACY_DIGEST_ALG
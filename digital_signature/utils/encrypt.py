@@ -1,45 +1,83 @@
 import base64
 import datetime
-from typing import Dict
-from .helper import canonicalize_metadata, sha256_digest
-from cryptography.hazmat.primitives import hashes, serialization
+from typing import Dict, Optional, Union
+from .helper import metadata_digest, sha256_digest
+from .metrics import stage
+from .digests import (
+    LEGACY_DIGEST_ALG,
+    SIGNATURE_SUPPORT,
+    default_digest_alg,
+    signature_hash,
+)
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric.padding import PSS, MGF1
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
+from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes
 from cryptography.hazmat.backends import default_backend
 
+# PEM bytes, or a key object from helper.load_signing_key
+SigningKey = Union[bytes, PrivateKeyTypes]
 
-def rsa_sign(private_pem: bytes, message: bytes) -> bytes:
+
+def _private_key(private_pem: SigningKey) -> PrivateKeyTypes:
+    """Parse PEM bytes; keys loaded by helper.load_signing_key pass through"""
+    if not isinstance(private_pem, bytes):
+        return private_pem
+    with stage("key_load"):
+        return serialization.load_pem_private_key(
+            private_pem, password=None, backend=default_backend()
+        )
+
+
+def rsa_sign(
+    private_pem: SigningKey,
+    message: bytes,
+    prehashed: bool = False,
+    digest_alg: str = LEGACY_DIGEST_ALG,
+) -> bytes:
     """
-    Sign message using RSA-PSS + SHA256
+    Sign message using RSA-PSS + `digest_alg` (SHA256 by default)
+    prehashed: `message` is already the `digest_alg` digest of the message
     returns: signature bytes
     """
-    private_key = serialization.load_pem_private_key(
-        private_pem, password=None, backend=default_backend()
-    )
-    signature = private_key.sign(
-        message,
-        PSS(mgf=MGF1(hashes.SHA256()), salt_length=hashes.SHA256().digest_size),
-        hashes.SHA256(),
-    )
+    private_key = _private_key(private_pem)
+    hash_algorithm = signature_hash(digest_alg)
+    with stage("sign"):
+        signature = private_key.sign(
+            message,
+            PSS(mgf=MGF1(hash_algorithm), salt_length=hash_algorithm.digest_size),
+            Prehashed(hash_algorithm) if prehashed else hash_algorithm,
+        )
     return signature
 
 
-def ecdsa_sign(private_pem: bytes, message: bytes) -> bytes:
+def ecdsa_sign(
+    private_pem: SigningKey,
+    message: bytes,
+    prehashed: bool = False,
+    digest_alg: str = LEGACY_DIGEST_ALG,
+) -> bytes:
     """
-    Sign the message using ECDSA with SHA256 (returns DER-encoded signature)
+    Sign the message using ECDSA with `digest_alg` (returns DER-encoded signature)
+    prehashed: `message` is already the `digest_alg` digest of the message
     """
-    private_key = serialization.load_pem_private_key(
-        private_pem, password=None, backend=default_backend()
-    )
-    signature = private_key.sign(message, ec.ECDSA(hashes.SHA256()))
+    private_key = _private_key(private_pem)
+    hash_algorithm = signature_hash(digest_alg)
+    with stage("sign"):
+        signature = private_key.sign(
+            message,
+            ec.ECDSA(Prehashed(hash_algorithm) if prehashed else hash_algorithm),
+        )
     return signature
 
 
 def sign_product(
     metadata: Dict,
-    private_pem: bytes,
+    private_pem: SigningKey,
     public_pem: bytes,
     algorithm: str = "RSA",  # or 'ECDSA'
+    digest_alg: Optional[str] = None,  # sha256, sha512_256, sha3_256, blake2b
 ) -> Dict:
     """
     Generate payload: {
@@ -49,27 +87,40 @@ def sign_product(
         "pubkey": public_pem_str,
         "pubkey_fingerprint": sha256(pubkey_pem),
         "algorithm": "RSA" or "ECDSA",
+        "digest_alg": hash used for digest & signature,
         "signed_at": "ISO timestamp"
     }
     """
-    message: bytes = canonicalize_metadata(metadata)
-    digest: str = sha256_digest(data=message)
-    if algorithm.upper() == "RSA":
-        signature = rsa_sign(private_pem, message)
-    elif algorithm.upper() == "ECDSA":
-        signature = ecdsa_sign(private_pem, message)
-    else:
+    algorithm = algorithm.upper()
+    if algorithm not in SIGNATURE_SUPPORT:
         raise ValueError("Unsupported algorithm")
+    digest_alg = digest_alg or default_digest_alg(algorithm)
+    if digest_alg not in SIGNATURE_SUPPORT[algorithm]:
+        raise ValueError(f"{digest_alg} digests are not supported with {algorithm}")
+
+    # Hash the canonical metadata once and sign that digest directly
+    message_digest: bytes = metadata_digest(metadata, digest_alg=digest_alg)
+    digest: str = message_digest.hex()
+    if algorithm == "RSA":
+        signature = rsa_sign(
+            private_pem, message_digest, prehashed=True, digest_alg=digest_alg
+        )
+    else:
+        signature = ecdsa_sign(
+            private_pem, message_digest, prehashed=True, digest_alg=digest_alg
+        )
 
-    signature_b64 = base64.b64encode(signature).decode("ascii")
-    pub_b64 = base64.b64encode(public_pem).decode("ascii")
+    with stage("base64"):
+        signature_b64 = base64.b64encode(signature).decode("ascii")
+        pub_b64 = base64.b64encode(public_pem).decode("ascii")
     payload = {
         "metadata": metadata,
         "signature": signature_b64,
         "digest": digest,
         "pubkey": pub_b64,
         "pubkey_fingerprint": sha256_digest(public_pem),
-        "algorithm": algorithm.upper(),
+        "algorithm": algorithm,
+        "digest_alg": digest_alg,
         "signed_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
     return payload
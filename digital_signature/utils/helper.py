@@ -3,10 +3,13 @@ import hashlib
 import base64
 import random
 import string
-import qrcode
 import io
+from ..core.canonical import canonical_hash
+from .digests import LEGACY_DIGEST_ALG, new_hasher
+from .metrics import stage
+from ..database import keystore
 from ..database.connection import db_settings
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
 from cryptography.hazmat.primitives.asymmetric import rsa, ec
 from cryptography.hazmat.backends import default_backend
@@ -16,8 +19,10 @@ from cryptography.hazmat.primitives.serialization import (
     PrivateFormat,
     PublicFormat,
     NoEncryption,
+    load_der_private_key,
     # BestAvailableEncryption,
 )
+from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes
 
 
 def generate_rsa_keypair(key_size: int = 3072) -> Tuple[bytes, bytes]:
@@ -63,9 +68,20 @@ def canonicalize_metadata(metadata: Dict) -> bytes:
     Standardize message before hash/sign process: JSON sorted keys, no whitespace
     --> ensure data consistency
     """
-    return json.dumps(
-        metadata, separators=(",", ":"), sort_keys=True, ensure_ascii=False
-    ).encode("utf-8")
+    with stage("canonicalize"):
+        return json.dumps(
+            metadata, separators=(",", ":"), sort_keys=True, ensure_ascii=False
+        ).encode("utf-8")
+
+
+def metadata_digest(metadata: Dict, digest_alg: str = LEGACY_DIGEST_ALG) -> bytes:
+    """
+    Digest (SHA256 by default) of the canonical metadata, streamed chunk by
+    chunk instead of hashing the output of canonicalize_metadata
+    (so the "hash" stage includes the canonical encoding)
+    """
+    with stage("hash"):
+        return canonical_hash(metadata, new_hasher(digest_alg)).digest()
 
 
 def sha256_digest(data: bytes) -> str:
@@ -77,12 +93,16 @@ def sha256_digest(data: bytes) -> str:
 
 
 def load_public_keys(author: str) -> Tuple[bytes, bytes]:
-    with open(db_settings.public_key_storage, "r") as f:
-        data = json.load(f)
-        author_keys = data.get(author, None)
+    """
+    (PEM, fingerprint) of the author's public key, as put in payloads. The
+    key is never parsed here, so there is no load_der_public_key: container
+    entries only get their stored DER wrapped back into PEM armor
+    """
+    with stage("key_load"):
+        author_keys = keystore.author_keys(keystore.PUBLIC, author)
 
         if author_keys:
-            public_pem = base64.b64decode(author_keys["public_key"])
+            public_pem = keystore.entry_pem(keystore.PUBLIC, author_keys)
             public_hashed = author_keys["fingerprint"]
         else:
             public_pem = None
@@ -92,50 +112,40 @@ def load_public_keys(author: str) -> Tuple[bytes, bytes]:
 
 
 def load_private_key(author: str) -> bytes:
-    with open(db_settings.private_key_storage, "r") as f:
-        data = json.load(f)
-        author_keys = data.get(author, None)
+    with stage("key_load"):
+        author_keys = keystore.author_keys(keystore.PRIVATE, author)
 
         if author_keys:
-            private_pem = base64.b64decode(author_keys["private_key"])
+            private_pem = keystore.entry_pem(keystore.PRIVATE, author_keys)
         else:
             private_pem = None
 
     return private_pem
 
 
+def load_signing_key(author: str) -> Optional[PrivateKeyTypes]:
+    """
+    The author's private key, parsed straight from its DER (no PEM armor);
+    sign_product accepts it in place of the PEM
+    """
+    with stage("key_load"):
+        author_keys = keystore.author_keys(keystore.PRIVATE, author)
+        if not author_keys:
+            return None
+        return load_der_private_key(
+            keystore.entry_der(keystore.PRIVATE, author_keys), password=None
+        )
+
+
 def register_key(private_key_pem: bytes, public_key_pem: bytes, author: str) -> None:
     """Store author along with their keys into database"""
-    public_keys: Dict[str, Any] = {
-        "public_key": base64.b64encode(public_key_pem).decode("ascii"),
-        "fingerprint": sha256_digest(public_key_pem),
-    }
-    private_keys: Dict[str, Any] = {
-        "private_key": base64.b64encode(private_key_pem).decode("ascii")
-    }
-
-    store_keys(storage=db_settings.public_key_storage, keys=public_keys, author=author)
-    store_keys(
-        storage=db_settings.private_key_storage, keys=private_keys, author=author
-    )
+    keystore.register(keystore.PUBLIC, author, public_key_pem)
+    keystore.register(keystore.PRIVATE, author, private_key_pem)
 
 
 def store_keys(storage: str, keys: Dict[str, Any], author: str) -> None:
-    try:
-        with open(storage, "r", encoding="ascii") as file:
-            data = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        data = {}
-
-    if data.get(author, None):
-        # Update if exist
-        for key, item in keys.items():
-            data[author].update(keys)
-    else:
-        data[author] = keys
-
-    with open(storage, "w") as file:
-        json.dump(data, file, indent=4)
+    """Add / update the author's keys in a single-file store"""
+    keystore.update_store(storage, author, keys)
 
 
 def load_transaction() -> Any:
@@ -152,21 +162,42 @@ def create_unique_filename(file_name: str):
     return filename + "_" + file_name
 
 
-def generate_qr(data_dict: dict) -> bytes:
-    """Generates QR code image"""
-    data_string = json.dumps(data_dict, ensure_ascii=False, separators=(",", ":"))
+def qr_data(data_dict: dict) -> str:
+    """Text encoded in the QR code of a payload"""
+    return json.dumps(data_dict, ensure_ascii=False, separators=(",", ":"))
 
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data_string)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    byte_io = io.BytesIO()
-    img.save(byte_io, format="PNG")
 
-    base64_encoded_data = base64.b64encode(byte_io.getvalue()).decode("utf-8")
+def render_qr_png(data_dict: dict) -> bytes:
+    """Render the payload as a QR code, returns PNG bytes"""
+    return render_qr_text(qr_data(data_dict))
+
+
+def render_qr_text(data_string: str) -> bytes:
+    """Render text as a QR code, returns PNG bytes"""
+    import qrcode  # imported on first use, the signing core does not need it
+
+    with stage("qr_render"):
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        qr.add_data(data_string)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+        byte_io = io.BytesIO()
+        img.save(byte_io, format="PNG")
+        return byte_io.getvalue()
+
+
+def generate_qr(data_dict: dict) -> str:
+    """
+    QR code image as a data URL. Only the benchmarks use it (bench_crypto,
+    perf_gate); the app serves /qr/<key>.png and sign_batch writes
+    render_qr_png output
+    """
+    png = render_qr_png(data_dict)
+    with stage("base64"):
+        base64_encoded_data = base64.b64encode(png).decode("utf-8")
     return f"data:image/png;base64,{base64_encoded_data}"
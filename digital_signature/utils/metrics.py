@@ -0,0 +1,200 @@
+"""
+In-process latency histograms & counters for the signing / verification stages,
+rendered in the Prometheus text exposition format (see api/metrics.py).
+
+    with stage("sign"):
+        ...
+
+When `db_settings.metrics_enabled` is off, `stage` hands back one shared no-op
+context manager, so instrumented code pays a single attribute lookup.
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from ..database.connection import db_settings
+
+# Seconds, from a cached signature check up to RSA-3072 key generation
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+STAGES: Tuple[str, ...] = (
+    "key_load",
+    "canonicalize",
+    "hash",
+    "sign",
+    "verify",
+    "base64",
+    "qr_render",
+    "qr_decode",
+    "ledger_write",
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(label: str, value: str, extra: str = "") -> str:
+    pairs = [f'{label}="{_escape(value)}"'] + ([extra] if extra else [])
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with a single label"""
+
+    def __init__(self, name: str, documentation: str, label: str):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_value, value in values:
+            lines.append(
+                f"{self.name}{_labels(self.label, label_value)} {_number(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with a single label"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        # label value -> ([count per bucket, +Inf last], sum)
+        self._values: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                label_value, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            values = sorted(
+                (label_value, list(counts), total[0])
+                for label_value, (counts, total) in self._values.items()
+            )
+        for label_value, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.label, label_value, le)} "
+                    f"{cumulative}"
+                )
+            labels = _labels(self.label, label_value)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "digital_signature_stage_duration_seconds",
+    "Time spent per signing/verification stage.",
+    label="stage",
+)
+STAGE_ERRORS = Counter(
+    "digital_signature_stage_errors_total",
+    "Stage runs that raised an exception.",
+    label="stage",
+)
+REGISTRY = (STAGE_SECONDS, STAGE_ERRORS)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+class _StageTimer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        STAGE_SECONDS.observe(self.name, time.perf_counter() - self.started)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(self.name)
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def stage(name: str) -> "_StageTimer | _NoopTimer":
+    """Time the enclosed block as stage `name` (one of STAGES)"""
+    if not db_settings.metrics_enabled:
+        return _NOOP
+    return _StageTimer(name)
+
+
+def render_metrics(metrics: Optional[Tuple] = None) -> str:
+    """Every registered metric in the Prometheus text format (version 0.0.4)"""
+    lines: List[str] = []
+    for metric in metrics or REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
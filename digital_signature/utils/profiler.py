@@ -0,0 +1,165 @@
+"""
+In-process sampling profiler producing collapsed stacks for flamegraphs.
+
+A daemon thread snapshots every thread's stack (`sys._current_frames`) at a
+fixed interval for a bounded duration; the profiled code is never touched, so
+the overhead is one stack walk per thread per sample. Each sample becomes
+
+    <thread name>;event:<State.handler>;<module:function>;...;<module:function> <count>
+
+in `db_settings.profile_storage`, ready for flamegraph.pl / speedscope /
+inferno. The `event:` frame is the outermost Reflex event handler on the stack
+(a `*State.<name>` method under `digital_signature.pages`), so samples group
+by event (e.g. `event:AppState.sign_payload`). Work a handler hands to a pool
+thread through `storage.run_io` has no handler on its own stack; while a run
+is active, run_io records the submitting event for that thread
+(`run_for_event`) and its samples are grouped under it as well.
+
+Runs are written to `<start time>-<pid>-<run>.folded`, so runs started in the
+same second (or by several workers) do not overwrite each other.
+"""
+
+import datetime
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from ..database.connection import db_settings
+
+EVENT_MODULE_PREFIX = "digital_signature.pages."
+MAX_STACK_DEPTH = 128
+
+T = TypeVar("T")
+
+# thread id -> event that submitted the call the thread is running
+_thread_events: Dict[int, str] = {}
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _event_name(frame: FrameType) -> Optional[str]:
+    qualname = frame.f_code.co_qualname
+    owner = qualname.split(".", 1)[0]
+    if owner.endswith("State") and "." in qualname:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(EVENT_MODULE_PREFIX):
+            return qualname
+    return None
+
+
+def event_on_stack(frame: Optional[FrameType]) -> Optional[str]:
+    """Outermost event handler on the stack starting at `frame`"""
+    event: Optional[str] = None
+    depth = 0
+    while frame is not None and depth < MAX_STACK_DEPTH:
+        event = _event_name(frame) or event
+        frame = frame.f_back
+        depth += 1
+    return event
+
+
+def run_for_event(event: str, fn: Callable[[], T]) -> T:
+    """Run `fn` with this thread's samples attributed to `event`"""
+    thread_id = threading.get_ident()
+    _thread_events[thread_id] = event
+    try:
+        return fn()
+    finally:
+        _thread_events.pop(thread_id, None)
+
+
+def collapse_stack(
+    frame: Optional[FrameType], thread_name: str, event: Optional[str] = None
+) -> str:
+    """`event` is used when no handler is on the stack itself"""
+    frames: List[str] = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        frames.append(_frame_label(frame))
+        event = _event_name(frame) or event  # ends at the outermost handler
+        frame = frame.f_back
+    frames.reverse()
+    root = [thread_name.replace(";", "_")] + ([f"event:{event}"] if event else [])
+    return ";".join(root + [label.replace(";", "_") for label in frames])
+
+
+def _sample(stacks: Counter, own_id: int) -> None:
+    """Add one snapshot of every other thread; frames are released on return"""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for thread_id, frame in sys._current_frames().items():
+        if thread_id != own_id:
+            stacks[
+                collapse_stack(
+                    frame, names.get(thread_id, "?"), _thread_events.get(thread_id)
+                )
+            ] += 1
+
+
+class SamplingProfiler:
+    """One profiling run at a time; `start` returns False while one is active"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._runs = 0
+        self.last_run: Dict[str, Any] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: Optional[float] = None) -> bool:
+        seconds = max(0.1, min(seconds, db_settings.profile_max_seconds))
+        interval = max(0.001, interval or db_settings.profile_interval)
+        with self._lock:
+            if self.running:
+                return False
+            started_at = datetime.datetime.now()
+            self._runs += 1
+            path = os.path.join(
+                db_settings.profile_storage,
+                f"{started_at:%Y%m%d-%H%M%S}-{os.getpid()}-{self._runs}.folded",
+            )
+            self.last_run = {
+                "path": path,
+                "seconds": seconds,
+                "interval": interval,
+                "started_at": started_at.isoformat(timespec="seconds"),
+                "samples": 0,
+                "done": False,
+            }
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(seconds, interval, path),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def _run(self, seconds: float, interval: float, path: str) -> None:
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        next_tick = time.monotonic()
+        while next_tick < deadline:
+            _sample(stacks, own_id)
+            samples += 1
+            # Skip missed ticks rather than bursting to catch up under load
+            next_tick = max(next_tick + interval, time.monotonic())
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+        self.last_run.update(samples=samples, done=True)
+
+
+profiler = SamplingProfiler()
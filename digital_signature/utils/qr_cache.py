@@ -0,0 +1,88 @@
+"""
+Content-addressed QR images, served by api/qr.py as `/qr/<key>.png`.
+
+The key is the SHA-256 of the text encoded in the QR code, so a URL always
+maps to the same image. `register` only stores that text (a few KB) under
+`db_settings.qr_cache_storage`; the PNG is rendered on the first request,
+written next to it and kept in a small in-memory LRU.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from ..database.connection import db_settings
+from .helper import qr_data, render_qr_text
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_memory: "OrderedDict[str, bytes]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _path(key: str, suffix: str) -> str:
+    return os.path.join(db_settings.qr_cache_storage, key[:2], key + suffix)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def register(payload: Dict) -> str:
+    """Make the payload's QR image servable, returns its key"""
+    text = qr_data(payload).encode("utf-8")
+    key = hashlib.sha256(text).hexdigest()
+    path = _path(key, ".txt")
+    if not os.path.exists(path):
+        _write_atomic(path, text)
+    return key
+
+
+def _remember(key: str, png: bytes) -> None:
+    with _lock:
+        _memory[key] = png
+        _memory.move_to_end(key)
+        while len(_memory) > db_settings.qr_cache_memory_items:
+            _memory.popitem(last=False)
+
+
+def exists(key: str) -> bool:
+    """True if `key` was registered (nothing is rendered)"""
+    if not KEY_PATTERN.match(key):
+        return False
+    with _lock:
+        if key in _memory:
+            return True
+    return os.path.exists(_path(key, ".txt")) or os.path.exists(_path(key, ".png"))
+
+
+def get_png(key: str) -> Optional[bytes]:
+    """PNG for a registered key (rendered on first use), None if unknown"""
+    if not KEY_PATTERN.match(key):
+        return None
+    with _lock:
+        png = _memory.get(key)
+        if png is not None:
+            _memory.move_to_end(key)
+            return png
+
+    try:
+        with open(_path(key, ".png"), "rb") as file:
+            png = file.read()
+    except FileNotFoundError:
+        try:
+            with open(_path(key, ".txt"), "rb") as file:
+                text = file.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+        png = render_qr_text(text)
+        _write_atomic(_path(key, ".png"), png)
+
+    _remember(key, png)
+    return png
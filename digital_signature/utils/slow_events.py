@@ -0,0 +1,209 @@
+"""
+Latency of Reflex event handlers and computed vars.
+
+    @rx.event
+    @timed_event
+    def sign_payload(self): ...
+
+    @rx.var
+    def payload_meta(self) -> Dict[str, Any]:
+        with timed_var("sender:AppState.payload_meta") as timer:
+            timer.value = ...
+        return timer.value
+
+Computed vars are timed from inside the body: Reflex derives their
+dependencies from the getter's bytecode, which a wrapper would hide.
+
+Every run feeds a rolling window per handler (`db_settings.slow_event_window`);
+runs over `db_settings.slow_event_threshold_ms` are logged as warnings with
+the size of the state delta they produced. With `db_settings.event_delta_stats`
+on, the delta size of every run is measured too (it costs one extra delta
+computation per event). `event_stats()` backs the admin route in api/admin.py.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+from ..database.connection import db_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _HandlerStats:
+    __slots__ = ("durations", "calls", "slow", "max_ms", "last_slow", "deltas")
+
+    def __init__(self, window: int):
+        self.durations: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.slow = 0
+        self.max_ms = 0.0
+        self.last_slow: Optional[Dict[str, Any]] = None
+        self.deltas: Deque[int] = deque(maxlen=window)
+
+
+_stats: Dict[str, _HandlerStats] = {}
+_lock = threading.Lock()
+
+
+def _percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+
+def _delta_bytes(state: Any) -> int:
+    """
+    Encoded size of the delta the handler produced (what Reflex ships to the
+    browser), falling back to the dirtied frontend vars; -1 if unknown
+    """
+    try:
+        delta = state.get_delta()
+    except Exception:
+        try:
+            delta = {
+                name: getattr(state, name)
+                for name in state.dirty_vars
+                if not name.startswith("_")  # backend-only vars are not sent
+            }
+        except Exception:
+            return -1
+    return len(json.dumps(delta, default=str).encode("utf-8"))
+
+
+def record(name: str, duration: float, delta: Callable[[], int]) -> None:
+    """`delta` is only called for slow runs, or for all with event_delta_stats"""
+    duration_ms = duration * 1000
+    slow = duration_ms > db_settings.slow_event_threshold_ms
+    delta_bytes = delta() if slow or db_settings.event_delta_stats else None
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _HandlerStats(db_settings.slow_event_window)
+        stats.durations.append(duration_ms)
+        stats.calls += 1
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        if delta_bytes is not None and delta_bytes >= 0:
+            stats.deltas.append(delta_bytes)
+        if slow:
+            stats.slow += 1
+            stats.last_slow = {
+                "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "duration_ms": round(duration_ms, 3),
+                "delta_bytes": delta_bytes,
+            }
+    if slow:
+        logger.warning(
+            "slow event %s: %.1f ms (threshold %.0f ms), state delta %s bytes",
+            name,
+            duration_ms,
+            db_settings.slow_event_threshold_ms,
+            delta_bytes,
+        )
+
+
+def _handler_name(fn: Callable) -> str:
+    page = fn.__module__.removeprefix("digital_signature.pages.").removesuffix(".state")
+    return f"{page}:{fn.__qualname__}"
+
+
+def timed_event(fn: Callable) -> Callable:
+    """Time a (sync, async or async generator) state event handler"""
+    name = _handler_name(fn)
+
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def async_gen_wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                async for update in fn(self, *args, **kwargs):
+                    yield update
+            finally:
+                record(name, time.perf_counter() - started, lambda: _delta_bytes(self))
+
+        return async_gen_wrapper
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(self, *args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started, lambda: _delta_bytes(self))
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - started, lambda: _delta_bytes(self))
+
+    return wrapper
+
+
+class _VarTimer:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value: Any = None
+
+
+@contextmanager
+def timed_var(name: str) -> Iterator[_VarTimer]:
+    """
+    Time a computed var evaluation; assign the result to `.value` to have its
+    size reported as the delta of slow evaluations
+    """
+    timer = _VarTimer()
+    started = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        record(
+            name,
+            time.perf_counter() - started,
+            lambda: len(json.dumps(timer.value, default=str).encode("utf-8")),
+        )
+
+
+def event_stats() -> Dict[str, Dict[str, Any]]:
+    """Rolling latency per handler / computed var, slowest p95 first"""
+    with _lock:
+        snapshot = [
+            (
+                name,
+                sorted(stats.durations),
+                stats.calls,
+                stats.slow,
+                stats.max_ms,
+                stats.last_slow,
+                list(stats.deltas),
+            )
+            for name, stats in _stats.items()
+            if stats.durations
+        ]
+    result: Dict[str, Dict[str, Any]] = {}
+    for name, ordered, calls, slow, max_ms, last_slow, deltas in snapshot:
+        result[name] = {
+            "calls": calls,
+            "slow": slow,
+            "window": len(ordered),
+            "p50_ms": round(_percentile(ordered, 50), 3),
+            "p95_ms": round(_percentile(ordered, 95), 3),
+            "p99_ms": round(_percentile(ordered, 99), 3),
+            "max_ms": round(max_ms, 3),
+            "last_slow": last_slow,
+        }
+        if deltas:
+            result[name]["delta_bytes_avg"] = round(sum(deltas) / len(deltas))
+            result[name]["delta_bytes_max"] = max(deltas)
+    return dict(sorted(result.items(), key=lambda item: -item[1]["p95_ms"]))
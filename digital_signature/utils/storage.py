@@ -0,0 +1,130 @@
+"""
+Awaitable access to the JSON stores and ledger for Reflex event handlers.
+
+Reflex runs handlers on the event loop that serves every session, so a slow
+read of `data/public_key.json` on the network volume stalls all of them.
+Here each blocking call runs on a dedicated pool of
+`db_settings.storage_io_workers` threads instead:
+
+    public_pem, _ = await storage.load_public_keys(author)
+    await storage.write_json(db_settings.transaction_storage, payload)
+
+The caller's context (trace span) is carried over to the worker thread, and
+while the sampling profiler runs, the worker's samples are attributed to the
+submitting event handler (see utils/profiler.py). The
+synchronous functions in utils/helper.py and database/ stay the API for the
+CLIs and benchmarks.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+from ..database import ledger, transactions
+from ..database.connection import db_settings
+from . import decrypt, helper
+from .profiler import event_on_stack, profiler, run_for_event
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=db_settings.storage_io_workers,
+                thread_name_prefix="storage-io",
+            )
+    return _executor
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the storage I/O pool"""
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    if profiler.running:
+        event = event_on_stack(sys._getframe(1))
+        if event is not None:
+            call = functools.partial(run_for_event, event, call)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+def _write_json(path: str, data: Any, indent: Optional[int]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=indent)
+    os.replace(tmp_path, path)
+
+
+async def write_json(path: str, data: Any, indent: Optional[int] = 4) -> None:
+    """Replace a JSON file atomically (readers never see a partial file)"""
+    await run_io(_write_json, path, data, indent)
+
+
+# Keys
+
+
+async def load_public_keys(author: str) -> Tuple[bytes, bytes]:
+    return await run_io(helper.load_public_keys, author)
+
+
+async def load_signing_key(author: str) -> Optional[helper.PrivateKeyTypes]:
+    return await run_io(helper.load_signing_key, author)
+
+
+async def register_key(
+    private_key_pem: bytes, public_key_pem: bytes, author: str
+) -> None:
+    await run_io(
+        helper.register_key,
+        private_key_pem=private_key_pem,
+        public_key_pem=public_key_pem,
+        author=author,
+    )
+
+
+async def authenticate_author_key(public_key: str, author: str) -> bool:
+    return await run_io(
+        decrypt.authenticate_author_key, public_key=public_key, author=author
+    )
+
+
+async def verify_received_payload(
+    payload: Dict, public_key: str, author: str
+) -> decrypt.VerificationResult:
+    """Includes the key registry lookup, hence the I/O pool"""
+    return await run_io(
+        decrypt.verify_received_payload,
+        payload=payload,
+        public_key=public_key,
+        author=author,
+    )
+
+
+# Transactions
+
+
+async def load_transaction() -> Any:
+    return await run_io(helper.load_transaction)
+
+
+async def latest_transaction(**filters: Any) -> Optional[Dict[str, Any]]:
+    return await run_io(transactions.latest_transaction, **filters)
+
+
+async def append_transaction(payload: Dict[str, Any]) -> str:
+    return await run_io(ledger.append_transaction, payload)
+
+
+async def insert_transactions(payloads: Iterable[Dict[str, Any]]) -> int:
+    return await run_io(transactions.insert_transactions, list(payloads))
@@ -0,0 +1,183 @@
+"""
+Lightweight trace spans, propagated through contextvars (so across `await`).
+
+    with span("upload_qr", file=name):
+        with span("qr_decode"):
+            ...
+
+Sampling is decided once per trace, at the root span, with probability
+`db_settings.trace_sample_rate` (0 turns tracing off); spans of unsampled
+traces are shared no-ops. Finished spans are appended to
+`db_settings.trace_storage`, one Chrome Trace Event ("ph": "X") per line.
+To open a file in Perfetto / chrome://tracing, wrap it first:
+
+    uv run python -m digital_signature.utils.tracing data/traces.jsonl trace.json
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import IO, Any, Dict, Optional
+from ..database.connection import db_settings
+
+_current: ContextVar[Optional["_BaseSpan"]] = ContextVar("trace_span", default=None)
+
+
+class _SpanExporter:
+    """Appends finished spans to the trace file, one JSON object per line"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._path = ""
+
+    def export(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None or self._path != db_settings.trace_storage:
+                self._open(db_settings.trace_storage)
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _open(self, path: str) -> None:
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._path = path
+
+
+_exporter = _SpanExporter()
+
+
+class _BaseSpan:
+    __slots__ = ()
+    sampled = False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_BaseSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+class _UnsampledSpan(_BaseSpan):
+    """Root of an unsampled trace: marks the context so children stay no-ops"""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "_UnsampledSpan":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current.reset(self._token)
+        return False
+
+
+class Span(_BaseSpan):
+    sampled = True
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "_start_ns",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self._start_ns = 0
+        self._token: Optional[Token] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self._start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        _exporter.export(
+            {
+                "name": self.name,
+                "cat": "digital_signature",
+                "ph": "X",
+                "ts": self._start_ns // 1000,
+                "dur": (end_ns - self._start_ns) // 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {
+                    "trace_id": self.trace_id,
+                    "span_id": self.span_id,
+                    "parent_id": self.parent_id,
+                    **self.attributes,
+                },
+            }
+        )
+        return False
+
+
+_NOOP = _BaseSpan()
+
+
+def span(name: str, **attributes: Any) -> _BaseSpan:
+    """Child of the current span, or the root of a new (maybe sampled) trace"""
+    parent = _current.get()
+    if parent is None:
+        rate = db_settings.trace_sample_rate
+        if rate <= 0:
+            return _NOOP
+        if rate < 1 and random.random() >= rate:
+            return _UnsampledSpan()
+        return Span(name, os.urandom(16).hex(), None, attributes)
+    if not parent.sampled:
+        return _NOOP
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+def to_chrome_trace(src: str, dst: str) -> int:
+    """Wrap a span file into a {"traceEvents": [...]} document, returns #spans"""
+    count = 0
+    with (
+        open(src, "r", encoding="utf-8") as source,
+        open(dst, "w", encoding="utf-8") as target,
+    ):
+        target.write('{"traceEvents":[\n')
+        for line in source:
+            if not line.strip():
+                continue
+            target.write((",\n" if count else "") + line.rstrip("\n"))
+            count += 1
+        target.write('\n],"displayTimeUnit":"ms"}\n')
+    return count
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else db_settings.trace_storage
+    dst = sys.argv[2] if len(sys.argv) > 2 else "trace.json"
+    print(f"{to_chrome_trace(src, dst)} spans written to {dst}")
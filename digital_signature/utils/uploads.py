@@ -0,0 +1,84 @@
+"""
+Bounded, streaming handling of uploaded QR images.
+
+Uploads are read in `db_settings.upload_chunk_bytes` chunks into a spooled
+buffer (in memory up to `db_settings.upload_spool_bytes`, then a temp file) and
+rejected as soon as they pass `db_settings.upload_max_bytes` or their first
+bytes are not a known image format, so nothing is ever read whole into memory.
+Decoders read from the returned buffer; `save_preview` copies it to a unique
+name so concurrent uploads of `qr.png` do not overwrite each other.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+from ..database.connection import db_settings
+from .helper import create_unique_filename
+
+# Leading bytes of the image formats the QR decoder accepts
+IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": ".png",
+    b"\xff\xd8\xff": ".jpg",
+    b"GIF87a": ".gif",
+    b"GIF89a": ".gif",
+    b"BM": ".bmp",
+}
+_SNIFF_BYTES = 12  # RIFF <size> WEBP is the longest check
+
+
+def image_suffix(head: bytes) -> Optional[str]:
+    """File suffix of the image format `head` starts with, None if unknown"""
+    for signature, suffix in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return suffix
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+async def spool_upload(
+    file: Any, max_bytes: Optional[int] = None
+) -> "tempfile.SpooledTemporaryFile[bytes]":
+    """
+    Stream an upload (anything with an async `read(size)`) into a spooled
+    buffer positioned at its start. Raises ValueError when the upload is not
+    an image or is larger than `max_bytes`
+    """
+    max_bytes = max_bytes or db_settings.upload_max_bytes
+    buffer = tempfile.SpooledTemporaryFile(max_size=db_settings.upload_spool_bytes)
+    try:
+        head = b""
+        while len(head) < _SNIFF_BYTES:
+            chunk = await file.read(_SNIFF_BYTES - len(head))
+            if not chunk:
+                break
+            head += chunk
+        if image_suffix(head) is None:
+            raise ValueError("Unsupported upload: not a PNG, JPEG, GIF, BMP or WEBP")
+        buffer.write(head)
+
+        size = len(head)
+        while chunk := await file.read(db_settings.upload_chunk_bytes):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Upload larger than {max_bytes} bytes")
+            buffer.write(chunk)
+        buffer.seek(0)
+        return buffer
+    except BaseException:
+        buffer.close()
+        raise
+
+
+def save_preview(buffer: Any, upload_dir: Path, file_name: str) -> Path:
+    """Copy the spooled upload under a unique name, the buffer is rewound"""
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    name = os.path.basename(file_name or "") or "upload"
+    path = upload_dir / create_unique_filename(name)
+    buffer.seek(0)
+    with open(path, "xb") as file:
+        shutil.copyfileobj(buffer, file, db_settings.upload_chunk_bytes)
+    buffer.seek(0)
+    return path
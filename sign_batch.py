@@ -0,0 +1,158 @@
+"""
+Sign a CSV or JSONL file of product metadata in bulk.
+
+    uv run python sign_batch.py products.csv --author "ACME FOOD JSC" -o signed.jsonl
+    uv run python sign_batch.py products.jsonl --author "ACME FOOD JSC" \\
+        --algorithm ecdsa --qr-dir qr/ --workers 8
+
+Rows are streamed through a process pool with a bounded number of rows in
+flight, so memory stays constant whatever the input size. Signed payloads are
+written as JSONL in input order.
+
+Verifiers look the key up under the metadata's `manufacturer`: rows without
+one are signed with `--author` filled in, rows naming another manufacturer
+are skipped with an error on stderr (and exit status 1).
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives.serialization import load_der_private_key
+
+from digital_signature.database.keyfile import pem_to_der
+from digital_signature.utils.batch import (
+    Progress,
+    bounded_map,
+    iter_records,
+    write_jsonl,
+)
+from digital_signature.utils.encrypt import sign_product
+from digital_signature.utils.helper import (
+    load_private_key,
+    load_public_keys,
+    render_qr_png,
+)
+
+# Set once per worker process by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(
+    author: str,
+    private_pem: bytes,
+    public_pem: bytes,
+    algorithm: str,
+    digest_alg: Optional[str],
+    qr_dir: Optional[str],
+) -> None:
+    _worker.update(
+        author=author,
+        # Parsed once per worker rather than once per row
+        private_key=load_der_private_key(pem_to_der(private_pem), password=None),
+        public_pem=public_pem,
+        algorithm=algorithm,
+        digest_alg=digest_alg,
+        qr_dir=qr_dir,
+    )
+
+
+def _qr_filename(index: int, metadata: Dict[str, Any]) -> str:
+    product_id = re.sub(r"[^A-Za-z0-9._-]+", "_", str(metadata.get("product_id", "")))
+    return f"{index:08d}_{product_id[:64]}.png"
+
+
+def _sign_row(
+    item: Tuple[int, Dict[str, Any]],
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """(payload, "") or (None, error) when the row names another manufacturer"""
+    index, metadata = item
+    author = _worker["author"]
+    manufacturer = metadata.get("manufacturer")
+    if not manufacturer:
+        metadata = {**metadata, "manufacturer": author}
+    elif str(manufacturer).lower() != author.lower():
+        return None, f"row {index}: manufacturer {manufacturer!r} is not {author!r}"
+
+    payload = sign_product(
+        metadata=metadata,
+        private_pem=_worker["private_key"],
+        public_pem=_worker["public_pem"],
+        algorithm=_worker["algorithm"],
+        digest_alg=_worker["digest_alg"],
+    )
+    if _worker["qr_dir"]:
+        path = os.path.join(_worker["qr_dir"], _qr_filename(index, metadata))
+        with open(path, "wb") as file:
+            file.write(render_qr_png(payload))
+    return payload, ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", help="CSV or JSONL file of product metadata")
+    parser.add_argument("--author", required=True, help="registered manufacturer")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output (- = stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format")
+    parser.add_argument("--algorithm", default="rsa", choices=["rsa", "ecdsa"])
+    parser.add_argument("--digest-alg", help="defaults to the platform default")
+    parser.add_argument("--qr-dir", help="also write one QR PNG per payload here")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--max-pending", type=int, default=0, help="rows in flight (default 4/worker)"
+    )
+    args = parser.parse_args()
+
+    private_pem = load_private_key(author=args.author)
+    public_pem, _ = load_public_keys(author=args.author)
+    if not private_pem or not public_pem:
+        print(f"No key pair registered for {args.author!r}", file=sys.stderr)
+        return 1
+    if args.qr_dir:
+        os.makedirs(args.qr_dir, exist_ok=True)
+
+    progress = Progress(total_bytes=os.path.getsize(args.input))
+    rows = enumerate(iter_records(args.input, fmt=args.format, progress=progress))
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    rejected = 0
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(
+                args.author,
+                private_pem,
+                public_pem,
+                args.algorithm,
+                args.digest_alg,
+                args.qr_dir,
+            ),
+        ) as executor:
+            for payload, error in bounded_map(
+                executor, _sign_row, rows, args.max_pending or 4 * args.workers
+            ):
+                if payload is None:
+                    progress.note(error)
+                    rejected += 1
+                else:
+                    write_jsonl(output, payload)
+                progress.advance()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        progress.finish()
+    if rejected:
+        print(f"{rejected} rows not signed", file=sys.stderr)
+    return 1 if rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
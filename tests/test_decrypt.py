@@ -0,0 +1,47 @@
+import unittest
+
+from digital_signature.utils.decrypt import (
+    ecdsa_verify,
+    rsa_verify,
+    verify_signed_product_payload,
+)
+from digital_signature.utils.encrypt import sign_product
+from digital_signature.utils.helper import (
+    generate_ecdsa_keypair,
+    generate_rsa_keypair,
+)
+
+METADATA = {"product_id": "P-1", "manufacturer": "Acme"}
+
+
+class DigestAlgorithmTest(unittest.TestCase):
+    """`digest_alg` comes from the payload: bad values fail, never raise"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rsa_private, cls.rsa_public = generate_rsa_keypair()
+        cls.rsa_payload = sign_product(
+            METADATA, cls.rsa_private, cls.rsa_public, algorithm="RSA"
+        )
+
+    def test_valid_payload(self):
+        self.assertTrue(verify_signed_product_payload(self.rsa_payload))
+
+    def test_rsa_with_blake2b(self):
+        payload = dict(self.rsa_payload, digest_alg="blake2b")
+        self.assertFalse(verify_signed_product_payload(payload))
+        self.assertFalse(
+            rsa_verify(self.rsa_public, b"message", b"signature", digest_alg="blake2b")
+        )
+
+    def test_unknown_digest_alg(self):
+        payload = dict(self.rsa_payload, digest_alg="md5")
+        self.assertFalse(verify_signed_product_payload(payload))
+        _, ecdsa_public = generate_ecdsa_keypair()
+        self.assertFalse(
+            ecdsa_verify(ecdsa_public, b"message", b"signature", digest_alg="md5")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Re-verify a JSONL dump of signed payloads offline.
+
+    uv run python verify_batch.py payloads.jsonl -o verdicts.jsonl
+    uv run python verify_batch.py payloads.jsonl --workers 8 --summary report.json
+
+Each payload runs through verify_payload (digest, key registry, signature;
+cheapest first) on a process pool. Raw lines are shipped to the workers in
+chunks and parsed there, with a bounded number of chunks in flight, so memory
+stays constant whatever the input size. One verdict per line is written as
+JSONL in input order, followed by a summary of counts, failure reasons and
+throughput.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from digital_signature.utils.batch import (
+    Progress,
+    bounded_map,
+    chunked,
+    iter_lines,
+    write_jsonl,
+)
+from digital_signature.core.verifier import STAGE_STRUCTURE
+from digital_signature.utils.decrypt import verify_payload
+
+# Set once per worker process by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(author: Optional[str], check_registry: bool) -> None:
+    _worker.update(author=author, check_registry=check_registry)
+
+
+def _verify_line(line: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(line)
+    except json.JSONDecodeError:
+        return {
+            "valid": False,
+            "failed_stage": STAGE_STRUCTURE,
+            "reason": "invalid JSON",
+        }
+    if not isinstance(payload, dict):
+        return {
+            "valid": False,
+            "failed_stage": STAGE_STRUCTURE,
+            "reason": "payload must be a JSON object",
+        }
+    result = verify_payload(
+        payload,
+        author=_worker["author"],
+        check_registry=_worker["check_registry"],
+    )
+    return {
+        "valid": result.valid,
+        "failed_stage": result.failed_stage,
+        "reason": result.reason,
+    }
+
+
+def _verify_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    return [{"line": number, **_verify_line(line)} for number, line in chunk]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", help="JSONL file of signed payloads")
+    parser.add_argument("-o", "--output", default="-", help="verdicts (- = stdout)")
+    parser.add_argument("--summary", help="also write the summary here as JSON")
+    parser.add_argument(
+        "--author", help="expected manufacturer (default: the one in the metadata)"
+    )
+    parser.add_argument(
+        "--skip-registry",
+        action="store_true",
+        help="do not check public keys against the key registry",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64, help="lines per task")
+    parser.add_argument(
+        "--max-pending", type=int, default=0, help="chunks in flight (default 4/worker)"
+    )
+    args = parser.parse_args()
+
+    progress = Progress(total_bytes=os.path.getsize(args.input))
+    lines = (
+        (number, line)
+        for number, line in enumerate(iter_lines(args.input, progress), start=1)
+        if line.strip()
+    )
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+
+    valid = 0
+    failed_stages: Counter = Counter()
+    reasons: Counter = Counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(args.author, not args.skip_registry),
+        ) as executor:
+            for verdicts in bounded_map(
+                executor,
+                _verify_chunk,
+                chunked(lines, args.chunk_size),
+                args.max_pending or 4 * args.workers,
+            ):
+                for verdict in verdicts:
+                    write_jsonl(output, verdict)
+                    if verdict["valid"]:
+                        valid += 1
+                    else:
+                        failed_stages[verdict["failed_stage"]] += 1
+                        reasons[verdict["reason"]] += 1
+                progress.advance(len(verdicts))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        progress.finish()
+
+    summary = {
+        "total": progress.items,
+        "valid": valid,
+        "invalid": progress.items - valid,
+        "failed_stages": dict(failed_stages.most_common()),
+        "failure_reasons": dict(reasons.most_common()),
+        "elapsed_seconds": round(time.monotonic() - progress.started, 3),
+        "items_per_second": round(progress.rate(), 1),
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=False), file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2, ensure_ascii=False)
+    return 0 if valid == progress.items else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())